@@ -0,0 +1,59 @@
+"""
+Tokens generated per request with and without character-budget stopping
+
+Usage (from the backend directory):
+    python -m benchmarks.generation_tokens --model distilgpt2 --rounds 5
+"""
+import argparse
+import time
+from services.transformer_generator import TransformerTweetGenerator
+
+PROMPTS = [
+    "Insights about AI Innovation:",
+    "Insights about the Future of Technology:",
+    "Insights about the Startup Ecosystem:",
+    "Insights about Climate Change:"
+]
+
+def count_generated_tokens(generator, output, prompts, num_return_sequences):
+    pad_token_id = generator.tokenizer.pad_token_id
+    total_tokens = int((output != pad_token_id).sum())
+    prompt_tokens = sum(
+        len(generator.tokenizer(prompt).input_ids) for prompt in prompts
+    ) * num_return_sequences
+    return total_tokens - prompt_tokens
+
+def run(generator, budget_stopping, rounds, max_length, num_return_sequences):
+    tokens = 0
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for prompt in PROMPTS:
+            output = generator.generate_sequences(
+                [prompt], max_length, num_return_sequences, budget_stopping=budget_stopping
+            )
+            tokens += count_generated_tokens(generator, output, [prompt], num_return_sequences)
+    elapsed = time.perf_counter() - started
+    requests = rounds * len(PROMPTS)
+    return tokens / requests, elapsed / requests
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--model', default='distilgpt2')
+    parser.add_argument('--rounds', type=int, default=3)
+    parser.add_argument('--max-length', type=int, default=280)
+    parser.add_argument('--num-return-sequences', type=int, default=3)
+    args = parser.parse_args()
+
+    generator = TransformerTweetGenerator(args.model)
+    if not generator.model:
+        raise SystemExit("Model could not be loaded")
+
+    print(f"{'mode':<22}{'tokens/request':>16}{'seconds/request':>18}")
+    for label, budget_stopping in (('before (max_length*2)', False), ('after (char budget)', True)):
+        tokens, seconds = run(
+            generator, budget_stopping, args.rounds, args.max_length, args.num_return_sequences
+        )
+        print(f"{label:<22}{tokens:>16.1f}{seconds:>18.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Compare latency, throughput and memory of the transformer CPU backends
+
+Each backend runs in its own process so peak memory is measured in isolation.
+
+Usage (from the backend directory):
+    python -m benchmarks.inference_backends --model distilgpt2 --backends torch int8 onnx
+"""
+import argparse
+import multiprocessing
+import resource
+import time
+from services.inference_backends import SUPPORTED_BACKENDS
+
+PROMPTS = [
+    "Insights about AI Innovation:",
+    "Insights about the Future of Technology:",
+    "Insights about the Startup Ecosystem:",
+    "Insights about Climate Change:"
+]
+
+def peak_rss_mb():
+    # ru_maxrss is reported in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def benchmark_backend(model_name, backend, rounds):
+    from services.transformer_generator import TransformerTweetGenerator
+
+    baseline_mb = peak_rss_mb()
+    started = time.perf_counter()
+    generator = TransformerTweetGenerator(model_name, backend=backend)
+    load_seconds = time.perf_counter() - started
+    if not generator.model:
+        return {'backend': backend, 'error': 'model could not be loaded'}
+
+    # Warm up once so lazy initialisation is not measured
+    generator.generate_tweet(PROMPTS[0])
+
+    latencies = []
+    for _ in range(rounds):
+        for prompt in PROMPTS:
+            started = time.perf_counter()
+            generator.generate_tweet(prompt)
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    for _ in range(rounds):
+        generator.generate_batch(PROMPTS)
+    batch_seconds = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'backend': backend,
+        'load_seconds': load_seconds,
+        'p50_latency': latencies[len(latencies) // 2],
+        'p95_latency': latencies[int(len(latencies) * 0.95) - 1],
+        'batch_throughput': rounds * len(PROMPTS) / batch_seconds,
+        'peak_rss_mb': peak_rss_mb(),
+        'model_rss_mb': peak_rss_mb() - baseline_mb
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--model', default='distilgpt2')
+    parser.add_argument('--backends', nargs='+', default=list(SUPPORTED_BACKENDS))
+    parser.add_argument('--rounds', type=int, default=3)
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context('spawn')
+    results = []
+    for backend in args.backends:
+        with context.Pool(1) as pool:
+            results.append(pool.apply(benchmark_backend, (args.model, backend, args.rounds)))
+
+    print(f"{'backend':<10}{'load s':>9}{'p50 s':>9}{'p95 s':>9}{'tweets/s':>11}{'peak MB':>10}{'model MB':>10}")
+    for result in results:
+        if 'error' in result:
+            print(f"{result['backend']:<10}  {result['error']}")
+            continue
+        print(
+            f"{result['backend']:<10}"
+            f"{result['load_seconds']:>9.2f}"
+            f"{result['p50_latency']:>9.3f}"
+            f"{result['p95_latency']:>9.3f}"
+            f"{result['batch_throughput']:>11.2f}"
+            f"{result['peak_rss_mb']:>10.0f}"
+            f"{result['model_rss_mb']:>10.0f}"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Micro-benchmark of tweet post-processing: per-item legacy cleanup vs the batch pipeline
+
+Usage (from the backend directory):
+    python -m benchmarks.postprocessing --candidates 24 --repeat 2000
+"""
+import argparse
+import random
+import re
+import timeit
+from services.tweet_postprocessing import clean_tweets
+
+SAMPLE = (
+    "The future of technology is  bright and   full of <pad> surprises, see "
+    "https://example.com/post for more.\nInnovation drives progress in unexpected "
+    "ways and learning never stops in our dynamic world. "
+)
+
+def legacy_clean_tweet(text, max_length=280):
+    # The per-item cleanup previously copied into each generator
+    text = re.sub(r'\s+', ' ', text).strip()
+    text = re.sub(r'http\S+', '', text)
+    text = re.sub(r'<.*?>', '', text)
+    text = text[:max_length]
+    if not re.search(r'#\w+', text):
+        hashtags = ['#Innovation', '#Technology', '#AI', '#Future']
+        text += f" {random.choice(hashtags)}"
+    return text.strip()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--candidates', type=int, default=24)
+    parser.add_argument('--repeat', type=int, default=2000)
+    args = parser.parse_args()
+
+    texts = [SAMPLE * (1 + index % 4) for index in range(args.candidates)]
+
+    legacy = timeit.timeit(
+        lambda: [legacy_clean_tweet(text) for text in texts], number=args.repeat
+    )
+    batch = timeit.timeit(lambda: clean_tweets(texts), number=args.repeat)
+
+    per_item = 1e6 / (args.candidates * args.repeat)
+    print(f"{'pipeline':<10}{'total s':>10}{'us/candidate':>15}")
+    print(f"{'legacy':<10}{legacy:>10.3f}{legacy * per_item:>15.2f}")
+    print(f"{'batch':<10}{batch:>10.3f}{batch * per_item:>15.2f}")
+    print(f"speedup: {legacy / batch:.2f}x")
+
+if __name__ == "__main__":
+    main()
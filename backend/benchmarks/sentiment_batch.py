@@ -0,0 +1,56 @@
+"""
+Batch sentiment throughput: the sequential loop vs the process pool at several worker counts
+
+Usage (from the backend directory):
+    python -m benchmarks.sentiment_batch --texts 20000 --workers 1,4,0
+
+A worker count of 0 means one worker per CPU core.
+"""
+import argparse
+import os
+import time
+from services.sentiment_batch import BatchSentimentEngine
+from services.sentiment_service import SentimentService
+
+SAMPLES = [
+    "Loving the new release, the team did an amazing job!",
+    "This update broke everything and support is not answering. Terrible.",
+    "Shipping the quarterly report tomorrow morning.",
+    "Not sure how I feel about the redesign, some parts are great, others not so much.",
+    "Huge thanks to everyone who joined the meetup yesterday :)"
+]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--texts', type=int, default=20000)
+    parser.add_argument('--workers', default='1,4,0')
+    parser.add_argument('--chunk-size', type=int, default=500)
+    args = parser.parse_args()
+
+    texts = [f"{SAMPLES[index % len(SAMPLES)]} #{index}" for index in range(args.texts)]
+
+    service = SentimentService()
+    start = time.perf_counter()
+    expected = [service.analyze_sentiment(text) for text in texts]
+    rows = [('sequential', time.perf_counter() - start)]
+
+    for workers in [int(value) for value in args.workers.split(',')]:
+        workers = workers or os.cpu_count() or 1
+        engine = BatchSentimentEngine(max_workers=workers, chunk_size=args.chunk_size)
+        # Warm the pool so worker start-up is not timed
+        list(engine.analyze(texts[:workers * args.chunk_size]))
+
+        start = time.perf_counter()
+        results = list(engine.analyze(texts))
+        rows.append((f"{workers} workers", time.perf_counter() - start))
+        engine.shutdown()
+
+        assert results == expected, "parallel results differ from the sequential loop"
+
+    baseline = rows[0][1]
+    print(f"{'mode':<14}{'total s':>10}{'texts/s':>12}{'speedup':>10}")
+    for name, elapsed in rows:
+        print(f"{name:<14}{elapsed:>10.3f}{args.texts / elapsed:>12.0f}{baseline / elapsed:>9.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Sentiment throughput per analyzer mode, and of the classify-only hot path
+
+Every text is unique, so the shared sentiment cache never hits and each
+row measures the analyzers themselves.
+
+Usage (from the backend directory):
+    python -m benchmarks.sentiment_modes --texts 20000
+"""
+import argparse
+import time
+from services.sentiment_service import SentimentService
+
+SAMPLES = [
+    "Loving the new release, the team did an amazing job!",
+    "This update broke everything and support is not answering. Terrible.",
+    "Shipping the quarterly report tomorrow morning.",
+    "Not sure how I feel about the redesign, some parts are great, others not so much.",
+    "Meeting moved to 3pm, same room as last week.",
+    "Huge thanks to everyone who joined the meetup yesterday :)"
+]
+
+def throughput(func, texts):
+    start = time.perf_counter()
+    for text in texts:
+        func(text)
+    return len(texts) / (time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--texts', type=int, default=20000)
+    args = parser.parse_args()
+
+    service = SentimentService()
+    vader = service.vader_analyzer
+
+    def batch(tag):
+        return [f"{SAMPLES[index % len(SAMPLES)]} #{tag}{index}" for index in range(args.texts)]
+
+    rows = [
+        ('both', throughput(lambda text: service.analyze_sentiment(text, 'both'), batch('b'))),
+        ('textblob', throughput(lambda text: service.analyze_sentiment(text, 'textblob'), batch('t'))),
+        ('vader (full)', throughput(vader.polarity_scores, batch('f'))),
+        ('vader', throughput(lambda text: service.analyze_sentiment(text, 'vader'), batch('v'))),
+        ('classify', throughput(service.classify_sentiment, batch('c')))
+    ]
+
+    baseline = rows[0][1]
+    print(f"{'mode':<14}{'texts/s':>12}{'vs both':>10}")
+    for name, rate in rows:
+        print(f"{name:<14}{rate:>12.0f}{rate / baseline:>9.2f}x")
+
+if __name__ == "__main__":
+    main()
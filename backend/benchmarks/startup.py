@@ -0,0 +1,67 @@
+"""
+Cold-start profile: time from a fresh interpreter until the app can serve
+
+Each run imports main in a new process with -X importtime and reports the
+wall-clock time plus the packages with the largest cumulative import cost.
+
+Usage (from the backend directory):
+    python -m benchmarks.startup --runs 3 --top 15
+"""
+import argparse
+import re
+import statistics
+import subprocess
+import sys
+
+IMPORT_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)$')
+
+PROBE = (
+    "import time; start = time.perf_counter(); import main; "
+    "print(f'ready {time.perf_counter() - start:.6f}')"
+)
+
+def profile_once():
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', PROBE],
+        capture_output=True, text=True, check=True
+    )
+    ready = float(re.search(r'^ready (\S+)$', result.stdout, re.MULTILINE).group(1))
+
+    # Children are printed before their parent, so walk bottom-up and count
+    # a module's cumulative time only where its package is entered
+    packages = {}
+    stack = []
+    for line in reversed(result.stderr.splitlines()):
+        match = IMPORT_LINE.match(line)
+        if not match:
+            continue
+        depth = len(match.group(3))
+        package = match.group(4).split('.')[0]
+        while stack and stack[-1][0] >= depth:
+            stack.pop()
+        if not stack or stack[-1][1] != package:
+            packages[package] = packages.get(package, 0) + int(match.group(2))
+        stack.append((depth, package))
+    return ready, packages
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--top', type=int, default=15)
+    args = parser.parse_args()
+
+    timings, packages = [], {}
+    for _ in range(args.runs):
+        ready, run_packages = profile_once()
+        timings.append(ready)
+        for package, micros in run_packages.items():
+            packages.setdefault(package, []).append(micros)
+
+    print(f"import main: median {statistics.median(timings):.3f}s over {args.runs} runs")
+    print(f"{'package':<28}{'ms':>10}")
+    ranked = sorted(packages.items(), key=lambda item: statistics.median(item[1]), reverse=True)
+    for package, micros in ranked[:args.top]:
+        print(f"{package:<28}{statistics.median(micros) / 1000:>10.1f}")
+
+if __name__ == "__main__":
+    main()
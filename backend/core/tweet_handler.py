@@ -1,19 +1,29 @@
 from typing import Optional, List
 import tweepy
 from backend.core.account_manager import AccountManager
+from backend.services.near_duplicate import NearDuplicateIndex
 
 class TweetHandler:
-    def __init__(self, account_manager: AccountManager):
+    def __init__(self, account_manager: AccountManager,
+                 duplicate_index: Optional[NearDuplicateIndex] = None):
+        """
+        :param account_manager: AccountManager holding the API clients
+        :param duplicate_index: Optional guard refusing near-duplicates of earlier posts
+        """
         self.account_manager = account_manager
+        self.duplicate_index = duplicate_index
 
     def post_tweet(self, username: str, content: str, 
-                   media_paths: Optional[List[str]] = None):
+                   media_paths: Optional[List[str]] = None,
+                   allow_duplicate: bool = False, duplicate_ref: Optional[str] = None):
         """
         Post a tweet for a specific account
         
         :param username: Account to post from
         :param content: Tweet text
         :param media_paths: Optional list of media file paths
+        :param allow_duplicate: Skip the near-duplicate guard for this post
+        :param duplicate_ref: Record the post under this ref, replacing the earlier post with it, e.g. a recurring job id
         """
         api = self.account_manager.get_account(username)
         
@@ -21,6 +31,13 @@ class TweetHandler:
             print(f"Account {username} not found!")
             return False
         
+        if self.duplicate_index and not allow_duplicate:
+            match = self.duplicate_index.find(username, content)
+            if match:
+                print(f"Refusing near-duplicate tweet for {username} "
+                      f"({match['similarity']:.0%} similar to: {match['text']})")
+                return False
+        
         try:
             if media_paths:
                 media_ids = [api.media_upload(media).media_id_string 
@@ -29,6 +46,9 @@ class TweetHandler:
             else:
                 tweet = api.update_status(status=content)
             
+            if self.duplicate_index:
+                self.duplicate_index.add(username, content, ref=duplicate_ref)
+            
             print(f"Tweet posted successfully for {username}")
             return tweet
         except Exception as e:
@@ -1,6 +1,10 @@
 import uvicorn
+import asyncio
+import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel, EmailStr, field_validator
 from typing import Optional
 import bcrypt
@@ -12,14 +16,37 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Import OAuth routes
-from routes.content_routes import router as content_routes_router
+from routes.content_routes import router as content_routes_router, content_generator
 from routes.tweet_generator_routes import router as tweet_generator_router
 from routes.ai_tweet_generator import router as ai_tweet_generator_router  # Corrected import
+from services.model_registry import model_registry
+from services.inference_executor import inference_executor
+from services.draft_pool import draft_pool
 
 # Load environment variables
 load_dotenv()
 
-app = FastAPI(title="X-Twitter Bot Backend")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Model warm-up: 'background' (default), 'eager' or 'lazy'
+    warmup_mode = os.getenv('MODEL_WARMUP', 'background')
+    if warmup_mode == 'eager':
+        await asyncio.to_thread(model_registry.warm_up, background=False)
+    elif warmup_mode == 'background':
+        model_registry.warm_up()
+    
+    # Pre-generate drafts for suggested topics while the server is idle
+    if os.getenv('DRAFT_POOL_ENABLED', 'true').lower() == 'true':
+        draft_pool.start()
+    
+    yield
+    
+    draft_pool.shutdown()
+    await content_generator.aclose()
+    model_registry.shutdown()
+    inference_executor.shutdown()
+
+app = FastAPI(title="X-Twitter Bot Backend", lifespan=lifespan)
 
 # CORS Configuration
 app.add_middleware(
@@ -112,5 +139,13 @@ async def register_account(user: UserCreate):
 async def root():
     return {"message": "Welcome to X-Twitter Bot Backend"}
 
+@app.get("/ready")
+async def readiness():
+    """
+    Readiness probe: 200 once the default model is loaded, 503 while warming up
+    """
+    status = model_registry.status()
+    return JSONResponse(status_code=200 if status['ready'] else 503, content=status)
+
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -1,17 +1,21 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import List, Literal
+from typing import List, Literal, Optional
+import asyncio
+import json
 import logging
+import threading
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Import your tweet generation service
-from services.transformer_generator import TransformerTweetGenerator
-
-# Initialize tweet generator
-tweet_generator = TransformerTweetGenerator()
+from services.model_registry import model_registry, TONE_PROMPT_PREFIXES
+from services.inference_executor import inference_executor, InferenceQueueFull
+from services.streaming import AsyncTokenStreamer
+from services.generation_cache import generation_cache
 
 # Router for AI Tweet Generation
 router = APIRouter(prefix="", tags=["AI Tweet Generation"])
@@ -21,6 +25,8 @@ class TweetGenerationRequest(BaseModel):
     topic: str
     tone: Literal['professional', 'casual', 'witty', 'inspirational']
     generationType: Literal['single', 'thread']
+    # Set for deterministic, cacheable generation
+    seed: Optional[int] = None
 
 # Response Model
 class TweetGenerationResponse(BaseModel):
@@ -46,33 +52,144 @@ async def generate_ai_tweets(request: TweetGenerationRequest):
             raise HTTPException(status_code=400, detail="Topic cannot be empty")
         
         # Construct prompt based on tone and topic
-        tone_prompts = {
-            'professional': f"A professional insight about {request.topic}:",
-            'casual': f"A casual take on {request.topic}:",
-            'witty': f"A witty observation about {request.topic}:",
-            'inspirational': f"An inspirational message related to {request.topic}:"
-        }
+        prefix = TONE_PROMPT_PREFIXES.get(request.tone, TONE_PROMPT_PREFIXES['professional'])
+        prompt = f"{prefix} {request.topic}:"
+        
+        tweet_generator = await model_registry.aget_generator()
         
-        prompt = tone_prompts.get(request.tone, tone_prompts['professional'])
+        # Seeded requests are deterministic, so repeats are served from the cache
+        cache_key = None
+        if request.seed is not None and tweet_generator.model is not None:
+            cache_key = generation_cache.make_key(
+                f"transformer-{tweet_generator.backend}",
+                model_registry.default_model,
+                prompt if request.generationType == 'single' else f"thread:3:{request.topic}",
+                request.tone,
+                request.seed,
+                280
+            )
+            cached = generation_cache.get(cache_key)
+            if cached is not None:
+                return TweetGenerationResponse(tweets=cached)
         
         # Generate tweets based on type
         if request.generationType == 'thread':
-            tweets = tweet_generator.generate_thread(
+            tweets = await inference_executor.run(
+                tweet_generator.generate_thread,
                 topic=request.topic, 
                 length=3, 
-                max_tweet_length=280
+                max_tweet_length=280,
+                seed=request.seed
+            )
+        elif request.seed is not None:
+            # Seeded tweets skip micro-batching so other requests cannot affect them
+            tweet = await inference_executor.run(
+                tweet_generator.generate_tweet,
+                prompt=prompt,
+                max_length=280,
+                seed=request.seed
             )
+            tweets = [tweet]
         else:
-            tweet = tweet_generator.generate_tweet(
+            # Micro-batch concurrent single-tweet requests into shared model calls
+            batching_engine = await model_registry.aget_engine()
+            tweet = await inference_executor.await_submitted(
+                batching_engine.submit,
                 prompt=prompt, 
                 max_length=280
             )
             tweets = [tweet]
         
+        if cache_key:
+            generation_cache.set(cache_key, tweets)
+        
         logger.info(f"Generated tweets: {tweets}")
         return TweetGenerationResponse(tweets=tweets)
     
+    except InferenceQueueFull as e:
+        logger.warning(f"Rejected tweet generation request: {e}")
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
     except Exception as e:
         # Log the error for debugging
         logger.error(f"Error generating tweets: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+
+def _sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@router.post("/ai/generate-tweets/stream")
+async def stream_ai_tweet(request: TweetGenerationRequest, http_request: Request):
+    """
+    Stream a single AI tweet as Server-Sent Events
+    
+    Emits a `token` event per decoded chunk and a final `done` event with the
+    cleaned tweet. Closing the connection cancels the generation.
+    """
+    if not request.topic:
+        raise HTTPException(status_code=400, detail="Topic cannot be empty")
+    if request.generationType != 'single':
+        raise HTTPException(status_code=400, detail="Streaming supports single tweets only")
+    
+    prefix = TONE_PROMPT_PREFIXES.get(request.tone, TONE_PROMPT_PREFIXES['professional'])
+    prompt = f"{prefix} {request.topic}:"
+    
+    tweet_generator = await model_registry.aget_generator()
+    streamer = AsyncTokenStreamer(tweet_generator.tokenizer, asyncio.get_running_loop())
+    cancel_event = threading.Event()
+    
+    try:
+        future = inference_executor.submit(
+            streamer.produce,
+            tweet_generator.stream_tweet,
+            prompt=prompt,
+            max_length=280,
+            cancel_event=cancel_event
+        )
+    except InferenceQueueFull as e:
+        logger.warning(f"Rejected streaming tweet request: {e}")
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    
+    async def events():
+        try:
+            async for text in streamer:
+                if await http_request.is_disconnected():
+                    logger.info("Client disconnected, cancelling tweet generation")
+                    return
+                yield _sse_event("token", {"text": text})
+            
+            tweet = await asyncio.wrap_future(future)
+            yield _sse_event("done", {"tweet": tweet})
+        except Exception as e:
+            logger.error(f"Error streaming tweet: {e}")
+            yield _sse_event("error", {"detail": str(e)})
+        finally:
+            # Releases the worker if the client went away mid-generation
+            cancel_event.set()
+    
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+@router.get("/ai/batching-stats")
+async def get_batching_stats():
+    """
+    Report batch sizes reached by the inference batching engine
+    """
+    if not model_registry.is_ready():
+        return {}
+    return model_registry.get_engine().stats()
+
+@router.get("/ai/prefix-cache-stats")
+async def get_prefix_cache_stats():
+    """
+    Report hits and evictions of the prompt prefix key/value cache
+    """
+    tweet_generator = model_registry.get_loaded()
+    if not tweet_generator or not tweet_generator.prefix_cache:
+        return {}
+    return tweet_generator.prefix_cache.stats()
+
+@router.get("/ai/inference-stats")
+async def get_inference_stats():
+    """
+    Report occupancy of the shared inference worker pool
+    """
+    return inference_executor.stats()
@@ -1,21 +1,59 @@
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
 from services.ai_content_generator import AIContentGenerator
+from services.content_generator import ContentGenerator
+from services.generation_cache import generation_cache
+from services.generation_metrics import generation_metrics
+from services.model_registry import model_registry, TONE_PROMPT_PREFIXES
+from services.sentiment_cache import sentiment_cache
+from services.inference_executor import inference_executor, InferenceQueueFull
+import asyncio
+import json
 import tweepy
 import os
 from dotenv import load_dotenv
-from typing import List
+from typing import List, Literal, Optional
 
 # Load environment variables
 load_dotenv()
 
 router = APIRouter()
 content_generator = AIContentGenerator()
+markov_generator = ContentGenerator()
+
+# Bulk generation limits
+BULK_MAX_ITEMS = int(os.getenv('BULK_MAX_ITEMS', '500'))
+BULK_MAX_CONCURRENCY = int(os.getenv('BULK_MAX_CONCURRENCY', '16'))
+BULK_MAX_THREAD_LENGTH = int(os.getenv('BULK_MAX_THREAD_LENGTH', '25'))
 
 class ContentRequest(BaseModel):
     topic: str = None
     tone: str = 'professional'
     thread_length: int = 3
+    # Set for deterministic, cacheable generation
+    seed: Optional[int] = None
+
+class BulkGenerationSpec(BaseModel):
+    topic: str = None
+    tone: str = 'professional'
+    # 1 generates a single tweet, more generates a thread
+    thread_length: int = Field(1, ge=1, le=BULK_MAX_THREAD_LENGTH)
+    generator: Literal['openai', 'transformer', 'markov'] = 'openai'
+    seed: Optional[int] = None
+
+class BulkGenerationRequest(BaseModel):
+    items: List[BulkGenerationSpec]
+    max_concurrency: Optional[int] = None
+
+def _cache_key(request: ContentRequest, prompt: Optional[str], provider: str) -> str:
+    # Keyed on the provider that produced the result, so fallback output
+    # is never served in place of an OpenAI answer
+    if provider == 'openai':
+        backend, model = 'openai', content_generator.openai_model
+    else:
+        backend, model = 'huggingface', 'templates'
+    return generation_cache.make_key(backend, model, prompt, request.tone, request.seed, 280)
 
 @router.post("/generate-tweet")
 async def generate_tweet(request: ContentRequest) -> dict:
@@ -23,10 +61,21 @@ async def generate_tweet(request: ContentRequest) -> dict:
     Generate a tweet using AI
     """
     try:
-        tweet = content_generator.generate_tweet(
-            topic=request.topic, 
-            tone=request.tone
-        )
+        tweet = None
+        if request.seed is not None:
+            tweet = generation_cache.get(
+                _cache_key(request, request.topic, content_generator.expected_provider())
+            )
+        
+        if tweet is None:
+            tweet, provider = await content_generator.agenerate_tweet(
+                topic=request.topic, 
+                tone=request.tone,
+                seed=request.seed,
+                return_provider=True
+            )
+            if request.seed is not None:
+                generation_cache.set(_cache_key(request, request.topic, provider), tweet)
         
         # Optional: Sentiment Analysis
         sentiment = content_generator.analyze_sentiment(tweet)
@@ -44,10 +93,22 @@ async def generate_thread(request: ContentRequest) -> dict:
     Generate a Twitter thread using AI
     """
     try:
-        thread = content_generator.generate_thread(
-            topic=request.topic, 
-            length=request.thread_length
-        )
+        prompt = f"thread:{request.thread_length}:{request.topic}"
+        thread = None
+        if request.seed is not None:
+            thread = generation_cache.get(
+                _cache_key(request, prompt, content_generator.expected_provider())
+            )
+        
+        if thread is None:
+            thread, provider = await content_generator.agenerate_thread(
+                topic=request.topic, 
+                length=request.thread_length,
+                seed=request.seed,
+                return_provider=True
+            )
+            if request.seed is not None:
+                generation_cache.set(_cache_key(request, prompt, provider), thread)
         
         return {
             "thread": thread,
@@ -56,6 +117,117 @@ async def generate_thread(request: ContentRequest) -> dict:
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/generation-cache-stats")
+async def get_generation_cache_stats() -> dict:
+    """
+    Report hits and misses of the generation result cache
+    """
+    return generation_cache.stats()
+
+@router.get("/generation-metrics")
+async def get_generation_metrics() -> dict:
+    """
+    Report per-provider latency, token and cost metrics of content generation
+    """
+    return generation_metrics.stats()
+
+@router.get("/sentiment-cache-stats")
+async def get_sentiment_cache_stats() -> dict:
+    """
+    Report hit rate and size of the shared sentiment score cache
+    """
+    return sentiment_cache.stats()
+
+@router.get("/provider-stats")
+async def get_provider_stats() -> dict:
+    """
+    Report OpenAI and Hugging Face health, latency and hedging statistics
+    """
+    return content_generator.provider_stats()
+
+async def _generate_bulk_item(spec: BulkGenerationSpec) -> List[str]:
+    if spec.generator == 'openai':
+        if spec.thread_length > 1:
+            return await content_generator.agenerate_thread(
+                topic=spec.topic, length=spec.thread_length, seed=spec.seed
+            )
+        return [await content_generator.agenerate_tweet(
+            topic=spec.topic, tone=spec.tone, seed=spec.seed
+        )]
+    
+    if spec.generator == 'markov':
+        if spec.thread_length > 1:
+            return await asyncio.to_thread(
+                markov_generator.generate_thread, spec.topic or 'Technology', spec.thread_length
+            )
+        return [await asyncio.to_thread(
+            markov_generator.generate_tweet, topic=spec.topic, style=spec.tone
+        )]
+    
+    topic = spec.topic or 'Technology'
+    tweet_generator = await model_registry.aget_generator()
+    if spec.thread_length > 1:
+        return await inference_executor.run(
+            tweet_generator.generate_thread,
+            topic=topic,
+            length=spec.thread_length,
+            max_tweet_length=280,
+            seed=spec.seed
+        )
+    
+    prefix = TONE_PROMPT_PREFIXES.get(spec.tone, TONE_PROMPT_PREFIXES['professional'])
+    prompt = f"{prefix} {topic}:"
+    if spec.seed is not None:
+        return [await inference_executor.run(
+            tweet_generator.generate_tweet, prompt=prompt, max_length=280, seed=spec.seed
+        )]
+    
+    # Unseeded tweets from the whole bulk request share micro-batched model calls
+    batching_engine = await model_registry.aget_engine()
+    return [await inference_executor.await_submitted(
+        batching_engine.submit, prompt=prompt, max_length=280
+    )]
+
+@router.post("/generate-bulk")
+async def generate_bulk(request: BulkGenerationRequest, http_request: Request):
+    """
+    Generate many tweets and threads concurrently
+    
+    Streams one NDJSON line per item as soon as it completes, tagged with the
+    item's index in the request. Failed items report their error instead of
+    failing the whole request.
+    """
+    if len(request.items) > BULK_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {BULK_MAX_ITEMS} items per request")
+    
+    concurrency = min(request.max_concurrency or BULK_MAX_CONCURRENCY, BULK_MAX_CONCURRENCY)
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+    
+    async def run(index: int, spec: BulkGenerationSpec) -> dict:
+        async with semaphore:
+            try:
+                tweets = await _generate_bulk_item(spec)
+                return {"index": index, "status": "ok", "tweets": tweets}
+            except InferenceQueueFull as e:
+                return {"index": index, "status": "error", "error": str(e), "retryable": True}
+            except Exception as e:
+                return {"index": index, "status": "error", "error": str(e), "retryable": False}
+    
+    async def results():
+        tasks = [asyncio.ensure_future(run(index, spec)) for index, spec in enumerate(request.items)]
+        try:
+            for next_result in asyncio.as_completed(tasks):
+                result = await next_result
+                if await http_request.is_disconnected():
+                    return
+                yield json.dumps(result) + "\n"
+        finally:
+            # Stop outstanding work if the client went away
+            for task in tasks:
+                task.cancel()
+    
+    return StreamingResponse(results(), media_type="application/x-ndjson")
+
 @router.post("/post-tweet")
 async def post_tweet(tweet: str) -> dict:
     """
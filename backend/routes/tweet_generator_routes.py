@@ -1,15 +1,51 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import List, Optional
-from services.transformer_generator import TransformerTweetGenerator
+from services.model_registry import model_registry
+from services.inference_executor import inference_executor, InferenceQueueFull
+from services.generation_cache import generation_cache
+from services.draft_pool import draft_pool
 
 router = APIRouter()
-generator = TransformerTweetGenerator()
+
+TONE_OPTIONS = [
+    {"value": "professional", "label": "Professional"},
+    {"value": "casual", "label": "Casual"},
+    {"value": "witty", "label": "Witty"},
+    {"value": "inspirational", "label": "Inspirational"}
+]
+
+TOPIC_SUGGESTIONS = [
+    "AI Innovation",
+    "Future of Technology", 
+    "Startup Ecosystem",
+    "Climate Change",
+    "Digital Transformation",
+    "Machine Learning Trends",
+    "Cybersecurity",
+    "Space Exploration",
+    "Renewable Energy",
+    "Blockchain Technology"
+]
+
+# Single-tweet prompts start with a fixed per-tone lead-in
+model_registry.register_prompt_prefixes(
+    *(f"{option['value']} perspective on" for option in TONE_OPTIONS)
+)
+
+# Keep drafts ready for every suggested topic in every tone
+draft_pool.register(
+    f"{option['value']} perspective on {topic}"
+    for topic in TOPIC_SUGGESTIONS
+    for option in TONE_OPTIONS
+)
 
 class TweetGenerationRequest(BaseModel):
     topic: str
     type: str = 'single'
     tone: Optional[str] = 'professional'
+    # Set for deterministic, cacheable generation
+    seed: Optional[int] = None
 
 class TweetGenerationResponse(BaseModel):
     content: List[str]
@@ -22,48 +58,77 @@ async def generate_tweet(request: TweetGenerationRequest):
         if not request.topic:
             raise HTTPException(status_code=400, detail="Topic cannot be empty")
         
-        if request.type == 'single':
-            tweet = generator.generate_tweet(
-                prompt=f"{request.tone} perspective on {request.topic}"
-            )
-            content = [tweet]
-        elif request.type == 'thread':
-            content = generator.generate_thread(
-                topic=request.topic, 
-                length=3
-            )
-        else:
+        if request.type not in ('single', 'thread'):
             raise HTTPException(status_code=400, detail="Invalid generation type")
         
+        prompt = f"{request.tone} perspective on {request.topic}"
+        
+        # Unseeded single tweets for suggested pairs are usually ready already
+        if request.type == 'single' and request.seed is None:
+            draft = draft_pool.take(prompt)
+            if draft is not None:
+                return {
+                    "content": [draft],
+                    "type": request.type,
+                    "character_counts": [len(draft)]
+                }
+        
+        generator = await model_registry.aget_generator()
+        
+        # Seeded requests are deterministic, so repeats are served from the cache
+        cache_key = None
+        content = None
+        if request.seed is not None and generator.model is not None:
+            cache_key = generation_cache.make_key(
+                f"transformer-{generator.backend}",
+                model_registry.default_model,
+                prompt if request.type == 'single' else f"thread:3:{request.topic}",
+                request.tone,
+                request.seed,
+                280
+            )
+            content = generation_cache.get(cache_key)
+        
+        if content is None:
+            if request.type == 'single':
+                tweet = await inference_executor.run(
+                    generator.generate_tweet,
+                    prompt=prompt,
+                    seed=request.seed
+                )
+                content = [tweet]
+            else:
+                content = await inference_executor.run(
+                    generator.generate_thread,
+                    topic=request.topic, 
+                    length=3,
+                    seed=request.seed
+                )
+            if cache_key:
+                generation_cache.set(cache_key, content)
+        
         return {
             "content": content,
             "type": request.type,
             "character_counts": [len(tweet) for tweet in content]
         }
     
+    except InferenceQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/topic-suggestions")
 async def get_topic_suggestions():
-    return [
-        "AI Innovation",
-        "Future of Technology", 
-        "Startup Ecosystem",
-        "Climate Change",
-        "Digital Transformation",
-        "Machine Learning Trends",
-        "Cybersecurity",
-        "Space Exploration",
-        "Renewable Energy",
-        "Blockchain Technology"
-    ]
+    return TOPIC_SUGGESTIONS
 
 @router.get("/tone-options")
 async def get_tone_options():
-    return [
-        {"value": "professional", "label": "Professional"},
-        {"value": "casual", "label": "Casual"},
-        {"value": "witty", "label": "Witty"},
-        {"value": "inspirational", "label": "Inspirational"}
-    ]
+    return TONE_OPTIONS
+
+@router.get("/draft-pool-stats")
+async def get_draft_pool_stats():
+    """
+    Report pre-generated draft pool depth and hit rate
+    """
+    return draft_pool.stats()
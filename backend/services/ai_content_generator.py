@@ -1,109 +1,376 @@
+import asyncio
 import os
 import random
-from typing import List, Optional
-from openai import OpenAI
+import time
+from typing import Callable, List, Optional
+import httpx
+from openai import OpenAI, AsyncOpenAI
 from dotenv import load_dotenv
-from textblob import TextBlob
 
 # Import Hugging Face generator as fallback
 from .huggingface_generator import HuggingFaceContentGenerator
+from .tweet_postprocessing import truncate_weighted
+from .provider_health import ProviderHealth
+from .generation_metrics import generation_metrics
+from .sentiment_cache import textblob_sentiment
 
 # Load environment variables
 load_dotenv()
 
 class AIContentGenerator:
+    openai_model = "gpt-3.5-turbo"
+
+    tone_instructions = {
+        'professional': "Use a formal, informative tone.",
+        'casual': "Use a friendly, conversational tone.",
+        'witty': "Use humor and clever wordplay."
+    }
+
     def __init__(self):
         # Initialize OpenAI client
         api_key = os.getenv('OPENAI_API_KEY')
         
+        # Async client limits
+        self.max_concurrency = int(os.getenv('OPENAI_MAX_CONCURRENCY', '200'))
+        self.request_timeout = float(os.getenv('OPENAI_TIMEOUT', '15'))
+        self._semaphore = None
+        
+        # Skip OpenAI for a cool-down after repeated failures
+        self.openai_health = ProviderHealth(
+            'openai',
+            failure_threshold=int(os.getenv('OPENAI_FAILURE_THRESHOLD', '5')),
+            cooldown_seconds=float(os.getenv('OPENAI_COOLDOWN_SECONDS', '30'))
+        )
+        self.huggingface_health = ProviderHealth('huggingface')
+        
+        # Start the local fallback when OpenAI has not answered within this budget (0 disables)
+        self.hedge_after = float(os.getenv('OPENAI_HEDGE_AFTER_MS', '0')) / 1000
+        self.hedges = 0
+        self.hedge_wins = 0
+        
         # Initialize Hugging Face generator as fallback
         self.huggingface_generator = HuggingFaceContentGenerator()
         
         if not api_key:
             print(" OpenAI API Key not set. Falling back to Hugging Face.")
             self.client = None
+            self.async_client = None
         else:
             try:
                 self.client = OpenAI(api_key=api_key)
+                
+                # One pooled, keep-alive connection set shared by every async call
+                self.async_client = AsyncOpenAI(
+                    api_key=api_key,
+                    timeout=self.request_timeout,
+                    http_client=httpx.AsyncClient(
+                        limits=httpx.Limits(
+                            max_connections=int(os.getenv('OPENAI_MAX_CONNECTIONS', '200')),
+                            max_keepalive_connections=int(os.getenv('OPENAI_KEEPALIVE_CONNECTIONS', '50')),
+                            keepalive_expiry=float(os.getenv('OPENAI_KEEPALIVE_EXPIRY', '30'))
+                        ),
+                        timeout=self.request_timeout
+                    )
+                )
             except Exception as e:
                 print(f"OpenAI initialization error: {e}")
                 self.client = None
+                self.async_client = None
+
+    def _tweet_request(self, topic: Optional[str], tone: str, seed: Optional[int]) -> dict:
+        """
+        Chat completion arguments for a single tweet
+        """
+        prompt = f"""Generate a compelling tweet about {topic or 'Technology'}. 
+                {self.tone_instructions.get(tone, self.tone_instructions['professional'])} 
+                Ensure the tweet is engaging and under 280 characters."""
+        
+        return {
+            'model': self.openai_model,
+            'messages': [
+                {"role": "system", "content": "You are a social media content generator."},
+                {"role": "user", "content": prompt}
+            ],
+            'max_tokens': 280,
+            **self._seed_kwargs(seed)
+        }
+
+    def _thread_request(self, topic: Optional[str], length: int, seed: Optional[int]) -> dict:
+        """
+        Chat completion arguments for a thread
+        """
+        prompt = f"""Create a {length}-tweet thread about {topic or 'Technology'}. 
+                Each tweet should build upon the previous one, 
+                creating a coherent narrative. Ensure each tweet 
+                is engaging and under 280 characters."""
+        
+        return {
+            'model': self.openai_model,
+            'messages': [
+                {"role": "system", "content": "You are a thread content generator."},
+                {"role": "user", "content": prompt}
+            ],
+            'max_tokens': 840,
+            **self._seed_kwargs(seed)
+        }
+
+    @staticmethod
+    def _parse_tweet(response) -> str:
+        tweet = response.choices[0].message.content.strip()
+        return truncate_weighted(tweet)
 
-    def generate_tweet(self, topic: str = None, tone: str = 'professional') -> str:
+    @staticmethod
+    def _parse_thread(response, length: int) -> List[str]:
+        thread_text = response.choices[0].message.content.strip().split('\n')
+        
+        # Ensure we have exactly 'length' tweets
+        return [truncate_weighted(tweet) for tweet in thread_text[:length]]
+
+    def generate_tweet(self, topic: str = None, tone: str = 'professional', seed: Optional[int] = None) -> str:
         """
         Generate a tweet with fallback to Hugging Face
+        
+        Passing a seed asks OpenAI for reproducible sampling and makes the
+        fallback deterministic.
         """
-        if self.client:
+        ticket = self.openai_health.allow() if self.client else None
+        if ticket:
             try:
-                # Existing OpenAI tweet generation logic
-                tones = {
-                    'professional': "Use a formal, informative tone.",
-                    'casual': "Use a friendly, conversational tone.",
-                    'witty': "Use humor and clever wordplay."
-                }
-                
-                prompt = f"""Generate a compelling tweet about {topic or 'Technology'}. 
-                {tones.get(tone, tones['professional'])} 
-                Ensure the tweet is engaging and under 280 characters."""
-                
-                response = self.client.chat.completions.create(
-                    model="gpt-3.5-turbo",
-                    messages=[
-                        {"role": "system", "content": "You are a social media content generator."},
-                        {"role": "user", "content": prompt}
-                    ],
-                    max_tokens=280
-                )
-                tweet = response.choices[0].message.content.strip()
-                return tweet
+                return self._call_openai('tweet', self._tweet_request(topic, tone, seed),
+                                         self._parse_tweet, ticket)
             except Exception as e:
                 print(f"OpenAI tweet generation failed: {e}")
         
         # Fallback to Hugging Face
-        return self.huggingface_generator.generate_tweet(topic, tone)
+        return self._call_fallback('tweet', self.huggingface_generator.generate_tweet,
+                                   topic, tone, seed=seed)
 
-    def generate_thread(self, topic: str = None, length: int = 3) -> List[str]:
+    def generate_thread(self, topic: str = None, length: int = 3, seed: Optional[int] = None) -> List[str]:
         """
         Generate a thread with fallback to Hugging Face
         """
-        if self.client:
+        ticket = self.openai_health.allow() if self.client else None
+        if ticket:
             try:
-                # Existing OpenAI thread generation logic
-                prompt = f"""Create a {length}-tweet thread about {topic or 'Technology'}. 
-                Each tweet should build upon the previous one, 
-                creating a coherent narrative. Ensure each tweet 
-                is engaging and under 280 characters."""
-                
-                response = self.client.chat.completions.create(
-                    model="gpt-3.5-turbo",
-                    messages=[
-                        {"role": "system", "content": "You are a thread content generator."},
-                        {"role": "user", "content": prompt}
-                    ],
-                    max_tokens=840
-                )
-                thread_text = response.choices[0].message.content.strip().split('\n')
-                
-                # Ensure we have exactly 'length' tweets
-                thread_text = thread_text[:length]
-                
-                return thread_text
+                return self._call_openai('thread', self._thread_request(topic, length, seed),
+                                         lambda response: self._parse_thread(response, length),
+                                         ticket)
             except Exception as e:
                 print(f"OpenAI thread generation failed: {e}")
         
         # Fallback to Hugging Face
-        return self.huggingface_generator.generate_thread(topic, length)
+        return self._call_fallback('thread', self.huggingface_generator.generate_thread,
+                                   topic, length, seed=seed)
+
+    async def agenerate_tweet(self, topic: str = None, tone: str = 'professional',
+                              seed: Optional[int] = None, return_provider: bool = False):
+        """
+        Generate a tweet without blocking the event loop, with fallback to Hugging Face
+        
+        With return_provider, returns (tweet, provider) where provider is
+        'openai' or 'huggingface', whichever produced the tweet.
+        """
+        provider, tweet = await self._agenerate(
+            'tweet',
+            self._tweet_request(topic, tone, seed),
+            self._parse_tweet,
+            lambda: self.huggingface_generator.generate_tweet(topic, tone, seed=seed)
+        )
+        return (tweet, provider) if return_provider else tweet
+
+    async def agenerate_thread(self, topic: str = None, length: int = 3,
+                               seed: Optional[int] = None, return_provider: bool = False):
+        """
+        Generate a thread without blocking the event loop, with fallback to Hugging Face
+        
+        With return_provider, returns (thread, provider) like agenerate_tweet.
+        """
+        provider, thread = await self._agenerate(
+            'thread',
+            self._thread_request(topic, length, seed),
+            lambda response: self._parse_thread(response, length),
+            lambda: self.huggingface_generator.generate_thread(topic, length, seed=seed)
+        )
+        return (thread, provider) if return_provider else thread
+
+    def expected_provider(self) -> str:
+        """
+        Provider the next request will try first: 'openai' unless it is unconfigured or its circuit is open
+        """
+        if self.async_client and self.openai_health.state != 'open':
+            return 'openai'
+        return 'huggingface'
+
+    async def _agenerate(self, operation: str, request: dict, parse: Callable, fallback: Callable):
+        """
+        Ask OpenAI, racing the blocking Hugging Face fallback against it once
+        the hedge budget runs out and using it whenever OpenAI fails or its
+        circuit is open
+
+        :return: (provider, result), provider being 'openai' or 'huggingface'
+        """
+        ticket = self.openai_health.allow() if self.async_client else None
+        if not ticket:
+            return 'huggingface', await self._afallback(operation, fallback)
+
+        primary = asyncio.ensure_future(self._aopenai(operation, request, parse, ticket))
+        pending = {primary}
+        hedge = None
+
+        if self.hedge_after > 0:
+            done, _ = await asyncio.wait(pending, timeout=self.hedge_after)
+            if not done:
+                self.hedges += 1
+                hedge = asyncio.ensure_future(self._afallback(operation, fallback))
+                pending.add(hedge)
+
+        last_error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task is hedge:
+                        if task.exception() is not None and primary in pending:
+                            # OpenAI may still answer
+                            last_error = task.exception()
+                            continue
+                        if primary in pending:
+                            self.hedge_wins += 1
+                        return 'huggingface', task.result()
+                    if task.exception() is None:
+                        return 'openai', task.result()
+                    last_error = task.exception()
+                    print(f"OpenAI generation failed: {last_error}")
+                    if hedge is None:
+                        hedge = asyncio.ensure_future(self._afallback(operation, fallback))
+                        pending.add(hedge)
+        finally:
+            for task in pending:
+                task.cancel()
+
+        # The hedged fallback failed first, then OpenAI failed too
+        raise last_error
+
+    def _call_openai(self, operation: str, request: dict, parse: Callable, ticket: int):
+        start = time.perf_counter()
+        try:
+            response = self.client.chat.completions.create(**request)
+        except Exception as e:
+            self._record_openai_failure(operation, request, start, e, ticket)
+            raise
+        return self._finish_openai(operation, request, response, parse, start)
+
+    async def _aopenai(self, operation: str, request: dict, parse: Callable, ticket: int):
+        queued = start = time.perf_counter()
+        try:
+            async with self._concurrency_limit():
+                start = time.perf_counter()
+                response = await self.async_client.chat.completions.create(**request)
+        except asyncio.CancelledError:
+            # Lost the hedge race, possibly while still waiting for a slot;
+            # not the provider's fault
+            self.openai_health.release(ticket)
+            raise
+        except Exception as e:
+            self._record_openai_failure(operation, request, start, e, ticket, start - queued)
+            raise
+        return self._finish_openai(operation, request, response, parse, start, start - queued)
+
+    def _finish_openai(self, operation: str, request: dict, response, parse: Callable,
+                       start: float, queue_wait: float = 0.0):
+        latency = time.perf_counter() - start
+        self.openai_health.record_success(latency)
+        
+        parsed = time.perf_counter()
+        result = parse(response)
+        usage = getattr(response, 'usage', None)
+        generation_metrics.record(
+            'openai',
+            operation,
+            latency,
+            model=request['model'],
+            queue_wait=queue_wait,
+            postprocess=time.perf_counter() - parsed,
+            prompt_tokens=getattr(usage, 'prompt_tokens', 0) or 0,
+            completion_tokens=getattr(usage, 'completion_tokens', 0) or 0,
+            items=len(result) if isinstance(result, list) else 1
+        )
+        return result
+
+    def _record_openai_failure(self, operation: str, request: dict, start: float,
+                               error: Exception, ticket: int, queue_wait: float = 0.0):
+        latency = time.perf_counter() - start
+        self.openai_health.record_failure(latency, ticket)
+        generation_metrics.record(
+            'openai', operation, latency, model=request['model'],
+            queue_wait=queue_wait, items=0, error=str(error)
+        )
+
+    async def _afallback(self, operation: str, fallback: Callable):
+        return await asyncio.to_thread(self._call_fallback, operation, fallback)
+
+    def _call_fallback(self, operation: str, func: Callable, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            latency = time.perf_counter() - start
+            self.huggingface_health.record_failure(latency)
+            generation_metrics.record('huggingface', operation, latency, model='templates',
+                                      items=0, error=str(e))
+            raise
+        latency = time.perf_counter() - start
+        self.huggingface_health.record_success(latency)
+        generation_metrics.record('huggingface', operation, latency, model='templates',
+                                  items=len(result) if isinstance(result, list) else 1)
+        return result
+
+    def provider_stats(self) -> dict:
+        """
+        Report per-provider health and hedging counters
+        """
+        return {
+            'openai': self.openai_health.stats(),
+            'huggingface': self.huggingface_health.stats(),
+            'hedging': {
+                'hedge_after_ms': self.hedge_after * 1000,
+                'hedges': self.hedges,
+                'hedge_wins': self.hedge_wins
+            }
+        }
+
+    def _concurrency_limit(self) -> asyncio.Semaphore:
+        # Created on first use so it binds to the running event loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def aclose(self):
+        """
+        Close the pooled async connections
+        """
+        if self.async_client:
+            await self.async_client.close()
+
+    @staticmethod
+    def _seed_kwargs(seed: Optional[int]) -> dict:
+        """
+        Completion arguments for deterministic mode
+        """
+        if seed is None:
+            return {}
+        return {'seed': seed, 'temperature': 0}
 
     def analyze_sentiment(self, text: str) -> dict:
         """
-        Analyze sentiment using TextBlob
+        Analyze sentiment using TextBlob, cached per text
         """
-        blob = TextBlob(text)
+        scores = textblob_sentiment(text)
         return {
-            'polarity': blob.sentiment.polarity,
-            'subjectivity': blob.sentiment.subjectivity,
-            'sentiment': 'positive' if blob.sentiment.polarity > 0 
-                         else 'negative' if blob.sentiment.polarity < 0 
+            'polarity': scores['polarity'],
+            'subjectivity': scores['subjectivity'],
+            'sentiment': 'positive' if scores['polarity'] > 0 
+                         else 'negative' if scores['polarity'] < 0 
                          else 'neutral'
         }
 
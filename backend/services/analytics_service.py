@@ -2,10 +2,16 @@ from typing import Dict, List, Any
 from datetime import datetime, timedelta
 import pandas as pd
 import tweepy
+from .markov_ingestion import markov_ingestor as shared_markov_ingestor
 
 class AnalyticsService:
-    def __init__(self, account_manager):
+    def __init__(self, account_manager, markov_ingestor=shared_markov_ingestor):
+        """
+        :param account_manager: AccountManager holding the API clients
+        :param markov_ingestor: Learns each account's voice from collected tweets; None disables
+        """
         self.account_manager = account_manager
+        self.markov_ingestor = markov_ingestor
         self.analytics_data: Dict[str, List[Dict[str, Any]]] = {}
     
     def collect_account_metrics(self, username: str):
@@ -54,6 +60,10 @@ class AnalyticsService:
             # Store analytics data
             self.analytics_data[username] = tweet_metrics
             
+            # Feed new tweets into the account's Markov model
+            if self.markov_ingestor:
+                self.markov_ingestor.ingest(username, tweet_metrics)
+            
             return metrics
         
         except Exception as e:
@@ -0,0 +1,293 @@
+import asyncio
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Dict, List, Optional
+from .sentiment_service import SentimentService
+
+class TokenBucket:
+    def __init__(self, rate_per_minute: float, burst: int):
+        """
+        Posting allowance of one account
+
+        :param rate_per_minute: Sustained posts per minute
+        :param burst: Posts allowed back to back after an idle period
+        """
+        self.rate = rate_per_minute / 60
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def delay(self) -> float:
+        """
+        Take a token, returning how long to wait before using it
+        """
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+class AutoReplyPipeline:
+    def __init__(self, tweet_handler, sentiment_service: Optional[SentimentService] = None,
+                 batch_size: Optional[int] = None, batch_wait: Optional[float] = None,
+                 max_in_flight: Optional[int] = None, rate_per_minute: Optional[float] = None,
+                 burst: Optional[int] = None, dedup_size: Optional[int] = None,
+                 max_retries: Optional[int] = None, retry_backoff: Optional[float] = None):
+        """
+        Reply to incoming mentions: batch classify, batch render, rate-limited posting per account
+
+        Classification and posting run in worker threads, so the event loop
+        serving requests is never blocked.
+
+        :param tweet_handler: TweetHandler used to post replies
+        :param sentiment_service: Classifies mentions and renders replies
+        :param batch_size: Mentions classified and rendered together
+        :param batch_wait: Seconds to wait for a batch to fill
+        :param max_in_flight: Accepted mentions not yet replied to; submissions beyond are rejected
+        :param rate_per_minute: Replies per minute per account
+        :param burst: Replies an idle account may post back to back
+        :param dedup_size: Mention ids remembered to prevent double replies
+        :param max_retries: Retries of a mention whose classification or reply failed
+        :param retry_backoff: Seconds before the first retry, doubled for each further one
+        """
+        self.tweet_handler = tweet_handler
+        self.sentiment_service = sentiment_service or SentimentService()
+        self.batch_size = batch_size or int(os.getenv('AUTO_REPLY_BATCH_SIZE', '64'))
+        self.batch_wait = (
+            batch_wait if batch_wait is not None
+            else float(os.getenv('AUTO_REPLY_BATCH_WAIT', '0.5'))
+        )
+        self.max_in_flight = max_in_flight or int(os.getenv('AUTO_REPLY_MAX_IN_FLIGHT', '5000'))
+        self.rate_per_minute = rate_per_minute or float(os.getenv('AUTO_REPLY_RATE_PER_MINUTE', '30'))
+        self.burst = burst or int(os.getenv('AUTO_REPLY_BURST', '5'))
+        self.dedup_size = dedup_size or int(os.getenv('AUTO_REPLY_DEDUP_SIZE', '100000'))
+        self.max_retries = (
+            max_retries if max_retries is not None
+            else int(os.getenv('AUTO_REPLY_MAX_RETRIES', '3'))
+        )
+        self.retry_backoff = (
+            retry_backoff if retry_backoff is not None
+            else float(os.getenv('AUTO_REPLY_RETRY_BACKOFF', '30'))
+        )
+
+        self._lock = threading.Lock()
+        # (account, mention id) of every mention accepted, oldest first
+        self._seen: OrderedDict = OrderedDict()
+        self._in_flight = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._incoming: Optional[asyncio.Queue] = None
+        self._posting: Dict[str, asyncio.Queue] = {}
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._posted_at = deque()
+        # (account, mention id) -> retries so far; only touched on the event loop
+        self._attempts: Dict[tuple, int] = {}
+        self.counters = {
+            'submitted': 0, 'duplicates': 0, 'rejected': 0, 'classified': 0,
+            'rendered': 0, 'posted': 0, 'retried': 0, 'failed': 0
+        }
+        self.batches = 0
+        self.batch_seconds = 0.0
+
+    async def start(self):
+        """
+        Start the batching stage on the running event loop
+        """
+        if self._tasks:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._incoming = asyncio.Queue()
+        self._tasks.append(asyncio.create_task(self._batch_loop()))
+
+    async def shutdown(self):
+        """
+        Stop all stages; mentions not yet posted are dropped
+        """
+        with self._lock:
+            self._loop = None
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._posting = {}
+
+    def submit(self, account: str, mention_id: int, text: str) -> bool:
+        """
+        Queue a mention for a reply; safe to call from any thread
+
+        :param account: Managed account that was mentioned
+        :param mention_id: Tweet id of the mention
+        :param text: Mention text
+        :return: False if the mention is a duplicate, the pipeline is full or not started
+        """
+        return self._offer(account, mention_id, text) == 'submitted'
+
+    def submit_mentions(self, account: str, mentions: List) -> List:
+        """
+        Queue tweepy mention statuses, e.g. from MentionIngestor
+
+        Mentions written by managed accounts are skipped, so the bot never
+        replies to its own replies.
+
+        :param account: Managed account that was mentioned
+        :param mentions: tweepy Status objects
+        :return: The statuses refused because the pipeline was full or stopped,
+                 for the caller to offer again; accepted, duplicate and skipped
+                 mentions are not included
+        """
+        managed = {username.lower() for username in self.tweet_handler.account_manager.get_accounts()}
+        return [
+            mention for mention in mentions
+            if mention.user.screen_name.lower() not in managed
+            and self._offer(
+                account, mention.id, getattr(mention, 'full_text', None) or mention.text
+            ) in ('rejected', 'stopped')
+        ]
+
+    def stats(self) -> Dict:
+        """
+        Report stage counters, queue depths and posting throughput
+
+        :return: Dictionary of pipeline statistics
+        """
+        with self._lock:
+            self._trim_posted(time.monotonic())
+            return {
+                **self.counters,
+                'in_flight': self._in_flight,
+                'max_in_flight': self.max_in_flight,
+                'incoming_queue': self._incoming.qsize() if self._incoming else 0,
+                'posting_queues': {account: queue.qsize() for account, queue in self._posting.items()},
+                'posted_last_minute': len(self._posted_at),
+                'batches': self.batches,
+                'mean_batch_ms': self.batch_seconds / self.batches * 1000 if self.batches else 0
+            }
+
+    def _offer(self, account: str, mention_id: int, text: str) -> str:
+        key = (account, mention_id)
+        with self._lock:
+            if self._loop is None:
+                return 'stopped'
+            if key in self._seen:
+                self.counters['duplicates'] += 1
+                return 'duplicate'
+            if self._in_flight >= self.max_in_flight:
+                self.counters['rejected'] += 1
+                return 'rejected'
+            # Enqueued under the lock, so shutdown cannot clear the loop in between
+            try:
+                self._loop.call_soon_threadsafe(self._incoming.put_nowait, (account, mention_id, text))
+            except RuntimeError:
+                # The loop has already closed
+                return 'stopped'
+            self._seen[key] = True
+            while len(self._seen) > self.dedup_size:
+                self._seen.popitem(last=False)
+            self._in_flight += 1
+            self.counters['submitted'] += 1
+            return 'submitted'
+
+    async def _batch_loop(self):
+        while True:
+            batch = [await self._incoming.get()]
+            deadline = self._loop.time() + self.batch_wait
+            while len(batch) < self.batch_size:
+                timeout = deadline - self._loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._incoming.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                replies = await asyncio.to_thread(self._classify_and_render, batch)
+            except Exception as e:
+                print(f"🚨 Auto-reply batch failed: {e}")
+                for account, mention_id, text in batch:
+                    self._retry(self._incoming, account, mention_id, (account, mention_id, text))
+                continue
+
+            for account, mention_id, reply in replies:
+                self._posting_queue(account).put_nowait((mention_id, reply))
+
+    def _classify_and_render(self, batch: List[tuple]) -> List[tuple]:
+        started = time.perf_counter()
+        texts = [text for _, _, text in batch]
+        scores = self.sentiment_service.batch_sentiment_analysis(texts, mode='vader')
+        labels = [
+            'positive' if score['vader_compound'] >= 0.05
+            else 'negative' if score['vader_compound'] <= -0.05
+            else 'neutral'
+            for score in scores
+        ]
+        replies = [
+            (account, mention_id, self.sentiment_service.generate_reply_based_on_sentiment(text, label))
+            for (account, mention_id, text), label in zip(batch, labels)
+        ]
+        with self._lock:
+            self.counters['classified'] += len(batch)
+            self.counters['rendered'] += len(replies)
+            self.batches += 1
+            self.batch_seconds += time.perf_counter() - started
+        return replies
+
+    def _posting_queue(self, account: str) -> asyncio.Queue:
+        queue = self._posting.get(account)
+        if queue is None:
+            queue = self._posting[account] = asyncio.Queue()
+            self._buckets[account] = TokenBucket(self.rate_per_minute, self.burst)
+            self._tasks.append(asyncio.create_task(self._post_loop(account, queue)))
+        return queue
+
+    async def _post_loop(self, account: str, queue: asyncio.Queue):
+        bucket = self._buckets[account]
+        while True:
+            mention_id, reply = await queue.get()
+            delay = bucket.delay()
+            if delay:
+                await asyncio.sleep(delay)
+            try:
+                result = await asyncio.to_thread(
+                    self.tweet_handler.reply_to_tweet, account, mention_id, reply
+                )
+            except Exception as e:
+                print(f"🚨 Auto-reply to {mention_id} failed: {e}")
+                result = False
+            if result:
+                self._attempts.pop((account, mention_id), None)
+                self._finish(1, 'posted')
+            else:
+                self._retry(queue, account, mention_id, (mention_id, reply))
+
+    def _retry(self, queue: asyncio.Queue, account: str, mention_id: int, item: tuple):
+        # The ingestion cursor is already past the mention, so nothing else
+        # would submit it again
+        key = (account, mention_id)
+        attempt = self._attempts.get(key, 0) + 1
+        if attempt > self.max_retries:
+            self._attempts.pop(key, None)
+            print(f"🚨 Giving up on auto-reply to {mention_id} after {attempt} attempts")
+            self._finish(1, 'failed')
+            return
+        self._attempts[key] = attempt
+        with self._lock:
+            self.counters['retried'] += 1
+        asyncio.get_running_loop().call_later(
+            self.retry_backoff * 2 ** (attempt - 1), queue.put_nowait, item
+        )
+
+    def _finish(self, count: int, outcome: str):
+        with self._lock:
+            self._in_flight -= count
+            self.counters[outcome] += count
+            if outcome == 'posted':
+                now = time.monotonic()
+                self._posted_at.extend([now] * count)
+                self._trim_posted(now)
+
+    def _trim_posted(self, now: float):
+        while self._posted_at and self._posted_at[0] < now - 60:
+            self._posted_at.popleft()
@@ -0,0 +1,186 @@
+import os
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+from queue import Queue, Empty
+from typing import Callable, Dict, List, Optional
+from .generation_metrics import set_queue_wait
+
+class BatchingInferenceEngine:
+    def __init__(self, generator, batch_window_ms: Optional[float] = None,
+                 max_batch_size: Optional[int] = None):
+        """
+        Micro-batch concurrent prompts into shared model calls
+
+        :param generator: Generator exposing generate_batch(prompts, max_length)
+        :param batch_window_ms: How long to wait for more prompts after the first one
+        :param max_batch_size: Maximum number of prompts per model call
+        """
+        self.generator = generator
+        self.batch_window_ms = (
+            batch_window_ms if batch_window_ms is not None
+            else float(os.getenv('GENERATION_BATCH_WINDOW_MS', '10'))
+        )
+        self.max_batch_size = (
+            max_batch_size if max_batch_size is not None
+            else int(os.getenv('GENERATION_MAX_BATCH_SIZE', '8'))
+        )
+
+        self._queue: Queue = Queue()
+        self._lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+        self._running = False
+
+        # Batch statistics
+        self._batch_sizes: Counter = Counter()
+        self._total_requests = 0
+        self._total_batches = 0
+
+    def submit(self, prompt: Optional[str] = None, max_length: int = 280,
+               on_done: Optional[Callable[[], None]] = None) -> Future:
+        """
+        Queue a prompt for the next batch
+
+        :param prompt: Prompt to complete
+        :param max_length: Maximum tweet length
+        :param on_done: Called once the engine is finished with the prompt, whether
+                        generated, failed or dropped after a cancel; unlike the
+                        future's callbacks it never runs while the prompt is computing
+        :return: Future resolved with the generated tweet
+        """
+        self._ensure_worker()
+        future: Future = Future()
+        self._queue.put((prompt, max_length, future, time.perf_counter(), on_done))
+        return future
+
+    def generate(self, prompt: Optional[str] = None, max_length: int = 280,
+                 timeout: Optional[float] = None) -> str:
+        """
+        Generate a tweet through the batching queue, blocking until done
+
+        :param prompt: Prompt to complete
+        :param max_length: Maximum tweet length
+        :param timeout: Optional seconds to wait for the result
+        :return: Generated tweet
+        """
+        return self.submit(prompt, max_length).result(timeout=timeout)
+
+    def stats(self) -> Dict:
+        """
+        Report the batch sizes the engine actually reached
+
+        :return: Dictionary of batching statistics
+        """
+        with self._lock:
+            histogram = dict(sorted(self._batch_sizes.items()))
+            return {
+                'batch_window_ms': self.batch_window_ms,
+                'max_batch_size': self.max_batch_size,
+                'total_requests': self._total_requests,
+                'total_batches': self._total_batches,
+                'average_batch_size': (
+                    self._total_requests / self._total_batches
+                    if self._total_batches else 0
+                ),
+                'largest_batch': max(histogram) if histogram else 0,
+                'batch_size_histogram': histogram,
+                'queue_depth': self._queue.qsize()
+            }
+
+    def shutdown(self):
+        """
+        Stop the batching worker after the current batch
+        """
+        with self._lock:
+            self._running = False
+            worker = self._worker
+            self._worker = None
+
+        if worker:
+            # Wake the worker so it notices the shutdown
+            self._queue.put(None)
+            worker.join()
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._worker is None:
+                self._running = True
+                self._worker = threading.Thread(
+                    target=self._run, name='batching-inference-engine', daemon=True
+                )
+                self._worker.start()
+
+    def _collect_batch(self) -> List:
+        """
+        Block for the first prompt, then gather more until the window closes
+        """
+        first = self._queue.get()
+        if first is None:
+            return []
+
+        batch = [first]
+        deadline = time.monotonic() + self.batch_window_ms / 1000
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except Empty:
+                break
+            if item is None:
+                break
+            batch.append(item)
+
+        return batch
+
+    def _run(self):
+        while self._running:
+            batch = self._collect_batch()
+            if not batch:
+                continue
+
+            with self._lock:
+                self._batch_sizes[len(batch)] += 1
+                self._total_requests += len(batch)
+                self._total_batches += 1
+
+            # Prompts with different length budgets cannot share a generate call
+            groups: Dict[int, List] = {}
+            for item in batch:
+                groups.setdefault(item[1], []).append(item)
+
+            for max_length, items in groups.items():
+                self._run_group(max_length, items)
+
+    def _run_group(self, max_length: int, items: List):
+        # Callers that cancelled while queued are dropped; the rest can no
+        # longer be cancelled, so one caller going away cannot fail the others
+        live = [item for item in items if item[2].set_running_or_notify_cancel()]
+        try:
+            if live:
+                self._generate(max_length, live)
+        finally:
+            for *_, on_done in items:
+                if on_done:
+                    on_done()
+
+    def _generate(self, max_length: int, items: List):
+        # Report the mean time the batched prompts spent queued
+        now = time.perf_counter()
+        set_queue_wait(sum(now - queued_at for _, _, _, queued_at, _ in items) / len(items))
+        try:
+            tweets = self.generator.generate_batch(
+                [prompt for prompt, *_ in items], max_length
+            )
+        except Exception as e:
+            # The shared model call failed, so every prompt in it failed
+            print(f"🚨 Batch Generation Error: {e}")
+            for _, _, future, _, _ in items:
+                future.set_exception(e)
+            return
+
+        for (_, _, future, _, _), tweet in zip(items, tweets):
+            if not future.done():
+                future.set_result(tweet)
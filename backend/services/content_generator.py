@@ -1,14 +1,15 @@
 import random
-from typing import List, Optional
-import markovify
-import nltk
-from textblob import TextBlob
+import re
+import time
+from typing import Dict, List, Optional, Tuple
+from .sentiment_cache import textblob_sentiment
+from .tweet_postprocessing import truncate_weighted
+from .generation_metrics import generation_metrics
+from .markov_registry import markov_registry
+from .markov_ingestion import markov_ingestor
 
 class ContentGenerator:
     def __init__(self):
-        # Download necessary NLTK data
-        nltk.download('punkt', quiet=True)
-        
         # Predefined content templates
         self.templates = [
             "Exciting news! {content}",
@@ -24,63 +25,147 @@ class ContentGenerator:
             "The future is full of incredible possibilities.",
             "Learning never stops in our dynamic world."
         ]
+        
+        # Extra sentences per topic, used when the seed text mentions the topic
+        self.topic_corpora: Dict[str, List[str]] = {}
+        
+        # Merged corpora with their registry digests, rebuilt only after add_training_text
+        self._corpora: Dict[str, Tuple[List[str], str]] = {}
+        
+        # Build the base model up front so the first tweet only pays for the walk
+        markov_registry.get('base', *self._corpus('base', []))
+    
+    def add_training_text(self, sentences: List[str], topic: Optional[str] = None):
+        """
+        Extend the Markov training corpus
+        
+        :param sentences: Sentences to learn from
+        :param topic: Topic the sentences belong to, or None for the base corpus
+        """
+        if topic:
+            self.topic_corpora.setdefault(topic.lower(), []).extend(sentences)
+        else:
+            self.training_data.extend(sentences)
+        self._corpora.clear()
     
     def generate_tweet(self, 
                        topic: Optional[str] = None, 
                        max_length: int = 280, 
-                       style: str = 'casual') -> str:
+                       style: str = 'casual',
+                       account: Optional[str] = None) -> str:
         """
         Generate a tweet with optional topic and style
         
         :param topic: Optional specific topic for the tweet
         :param max_length: Maximum tweet length
         :param style: Tweet style (casual, professional, etc.)
+        :param account: Write in the voice of this account's ingested timeline
         :return: Generated tweet text
         """
+        start = time.perf_counter()
         if topic:
             # Generate content based on topic
-            base_content = f"Thoughts on {topic}: " + self._generate_markov_text(topic)
+            base_content = f"Thoughts on {topic}: " + self._generate_markov_text(topic, account=account)
         else:
             # Generate random content
-            base_content = self._generate_markov_text()
+            base_content = self._generate_markov_text(account=account)
+        generated = time.perf_counter()
         
         # Apply template
         tweet = random.choice(self.templates).format(content=base_content)
         
         # Truncate to max length
-        return tweet[:max_length]
+        tweet = truncate_weighted(tweet, max_length)
+        
+        generation_metrics.record('markov', 'tweet', generated - start, model='markovify',
+                                  postprocess=time.perf_counter() - generated)
+        return tweet
     
-    def _generate_markov_text(self, seed: Optional[str] = None, length: int = 50) -> str:
+    def _generate_markov_text(self, seed: Optional[str] = None, length: int = 50,
+                              account: Optional[str] = None) -> str:
         """
         Generate text using Markov chain
         
-        :param seed: Optional seed text
+        :param seed: Optional seed text; topics it mentions select the corpus
         :param length: Desired text length
+        :param account: Prefer the model learned from this account's tweets
         :return: Generated text
         """
+        account_model = markov_ingestor.get_model(account) if account else None
+        if account_model is not None:
+            generated_text = account_model.make_short_sentence(length)
+            if generated_text:
+                return generated_text
+        
+        key, corpus, digest = self._corpus_for(seed)
         try:
-            # Use seed or training data
-            text_model = markovify.Text(self.training_data)
-            generated_text = text_model.make_short_sentence(length) or random.choice(self.training_data)
-            return generated_text
+            text_model = markov_registry.get(key, corpus, digest)
+            generated_text = text_model.make_short_sentence(length)
+            if generated_text:
+                return generated_text
         except Exception:
-            return random.choice(self.training_data)
+            pass
+        return self._closest_sentence(corpus, seed)
+    
+    def _corpus_for(self, seed: Optional[str]) -> Tuple[str, List[str], str]:
+        """
+        Pick the corpus for a seed: the base data plus every topic corpus it mentions
+        
+        :return: (corpus key, sentences, registry digest)
+        """
+        topics = []
+        if seed and self.topic_corpora:
+            words = set(re.findall(r'\w+', seed.lower()))
+            topics = sorted(
+                topic for topic in self.topic_corpora
+                if set(re.findall(r'\w+', topic)) & words
+            )
+        key = '+'.join(topics) or 'base'
+        return (key, *self._corpus(key, topics))
+    
+    def _corpus(self, key: str, topics: List[str]) -> Tuple[List[str], str]:
+        """
+        Merged corpus and digest for a topic combination, built once per corpus version
+        """
+        cached = self._corpora.get(key)
+        if cached is None:
+            corpus = list(self.training_data)
+            for topic in topics:
+                corpus.extend(self.topic_corpora[topic])
+            cached = (corpus, markov_registry.digest(key, corpus))
+            self._corpora[key] = cached
+        return cached
+    
+    @staticmethod
+    def _closest_sentence(corpus: List[str], seed: Optional[str]) -> str:
+        # Prefer sentences sharing words with the seed when the chain yields nothing
+        if seed:
+            words = set(re.findall(r'\w+', seed.lower()))
+            related = [
+                sentence for sentence in corpus
+                if set(re.findall(r'\w+', sentence.lower())) & words
+            ]
+            if related:
+                return random.choice(related)
+        return random.choice(corpus)
     
     def generate_thread(self, 
                         topic: str, 
                         num_tweets: int = 3, 
-                        max_length: int = 280) -> List[str]:
+                        max_length: int = 280,
+                        account: Optional[str] = None) -> List[str]:
         """
         Generate a tweet thread on a specific topic
         
         :param topic: Thread topic
         :param num_tweets: Number of tweets in the thread
         :param max_length: Maximum length per tweet
+        :param account: Write in the voice of this account's ingested timeline
         :return: List of tweet texts
         """
         thread = []
         for i in range(num_tweets):
-            tweet = self.generate_tweet(topic, max_length)
+            tweet = self.generate_tweet(topic, max_length, account=account)
             thread.append(tweet)
         return thread
     
@@ -95,8 +180,7 @@ class ContentGenerator:
         :return: Reply text
         """
         # Analyze original tweet sentiment
-        blob = TextBlob(original_tweet)
-        original_sentiment = blob.sentiment.polarity
+        original_sentiment = textblob_sentiment(original_tweet)['polarity']
         
         # Generate reply based on sentiment
         if sentiment == 'positive':
@@ -122,4 +206,4 @@ class ContentGenerator:
         reply_content = self._generate_markov_text(original_tweet)
         reply = random.choice(reply_template).format(content=reply_content)
         
-        return reply[:280]  # Ensure tweet length
+        return truncate_weighted(reply, 280)  # Ensure tweet length
@@ -0,0 +1,187 @@
+import os
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Optional
+from .model_registry import model_registry
+from .inference_executor import inference_executor, InferenceQueueFull
+
+class DraftPool:
+    def __init__(self, producer: Callable[[str, int], Optional[List[str]]],
+                 is_idle: Callable[[], bool] = lambda: True,
+                 capacity: Optional[int] = None, ttl_seconds: Optional[float] = None,
+                 refill_interval: Optional[float] = None, refill_batch_size: Optional[int] = None):
+        """
+        Bounded per-prompt pools of pre-generated drafts, refilled in the background
+
+        :param producer: Generates drafts for a prompt, or returns None when it cannot yet
+        :param is_idle: Refills only run while this returns True
+        :param capacity: Drafts kept per prompt
+        :param ttl_seconds: How long a draft stays servable
+        :param refill_interval: Seconds between refill passes
+        :param refill_batch_size: Drafts generated per producer call
+        """
+        self.producer = producer
+        self.is_idle = is_idle
+        self.capacity = capacity or int(os.getenv('DRAFT_POOL_CAPACITY', '5'))
+        self.ttl_seconds = (
+            ttl_seconds if ttl_seconds is not None
+            else float(os.getenv('DRAFT_POOL_TTL', '600'))
+        )
+        self.refill_interval = (
+            refill_interval if refill_interval is not None
+            else float(os.getenv('DRAFT_POOL_REFILL_INTERVAL', '1'))
+        )
+        self.refill_batch_size = refill_batch_size or int(os.getenv('DRAFT_POOL_REFILL_BATCH_SIZE', '4'))
+
+        # prompt -> deque of (expires_at, draft), oldest first
+        self._pools: Dict[str, deque] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.produced = 0
+
+    def register(self, prompts: Iterable[str]):
+        """
+        Keep drafts ready for these prompts
+
+        :param prompts: Exact prompts served from the pool
+        """
+        with self._lock:
+            for prompt in prompts:
+                self._pools.setdefault(prompt, deque())
+        self._wake.set()
+
+    def take(self, prompt: str) -> Optional[str]:
+        """
+        Pop a ready draft for a prompt
+
+        :param prompt: Prompt the draft was generated from
+        :return: Draft, or None when the prompt is not pooled or the pool is empty
+        """
+        with self._lock:
+            pool = self._pools.get(prompt)
+            if pool is None:
+                return None
+            self._drop_expired(pool, time.time())
+            if pool:
+                self.hits += 1
+                draft = pool.popleft()[1]
+            else:
+                self.misses += 1
+                draft = None
+        self._wake.set()
+        return draft
+
+    def start(self):
+        """
+        Start the background refill thread
+        """
+        if self._worker is None or not self._worker.is_alive():
+            self._stopped.clear()
+            self._worker = threading.Thread(target=self._run, name='draft-pool', daemon=True)
+            self._worker.start()
+
+    def shutdown(self):
+        """
+        Stop refilling; a producer call already running is allowed to finish
+        """
+        self._stopped.set()
+        self._wake.set()
+
+    def stats(self) -> Dict:
+        """
+        Report pool depth and hit rate
+
+        :return: Dictionary of pool statistics
+        """
+        with self._lock:
+            now = time.time()
+            depths = {}
+            for prompt, pool in self._pools.items():
+                self._drop_expired(pool, now)
+                depths[prompt] = len(pool)
+            lookups = self.hits + self.misses
+            return {
+                'keys': len(self._pools),
+                'capacity_per_key': self.capacity,
+                'ttl_seconds': self.ttl_seconds,
+                'total_depth': sum(depths.values()),
+                'empty_keys': sum(1 for depth in depths.values() if depth == 0),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0,
+                'expired': self.expired,
+                'produced': self.produced,
+                'depth': depths
+            }
+
+    def _drop_expired(self, pool: deque, now: float):
+        while pool and pool[0][0] < now:
+            pool.popleft()
+            self.expired += 1
+
+    def _neediest_prompt(self) -> Optional[str]:
+        with self._lock:
+            now = time.time()
+            neediest, lowest = None, self.capacity
+            for prompt, pool in self._pools.items():
+                self._drop_expired(pool, now)
+                if len(pool) < lowest:
+                    neediest, lowest = prompt, len(pool)
+            return neediest
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wake.wait(self.refill_interval)
+            self._wake.clear()
+
+            # Fill the emptiest pool first, one small batch at a time, so
+            # live requests arriving meanwhile are not held up for long
+            while not self._stopped.is_set() and self.is_idle():
+                prompt = self._neediest_prompt()
+                if prompt is None:
+                    break
+                try:
+                    drafts = self.producer(prompt, self.refill_batch_size)
+                except Exception as e:
+                    print(f"🚨 Draft pool refill failed: {e}")
+                    break
+                if not drafts:
+                    break
+
+                with self._lock:
+                    pool = self._pools[prompt]
+                    expires_at = time.time() + self.ttl_seconds
+                    for draft in drafts[:self.capacity - len(pool)]:
+                        pool.append((expires_at, draft))
+                        self.produced += 1
+
+def _produce_transformer_drafts(prompt: str, count: int) -> Optional[List[str]]:
+    # Never triggers a model load; warm-up takes care of that
+    generator = model_registry.get_loaded()
+    if generator is None or generator.model is None:
+        return None
+    try:
+        # Runs on the shared inference workers, so a refill never adds a
+        # model call beyond INFERENCE_WORKERS next to live requests
+        future = inference_executor.submit(generator.generate_batch, [prompt] * count, raise_errors=True)
+    except InferenceQueueFull:
+        # Busy with live requests; try again on a later pass
+        return None
+    try:
+        # Placeholder messages from a failed generation must never be pooled
+        return future.result()
+    except Exception as e:
+        print(f"🚨 Draft generation failed, skipping refill: {e}")
+        return None
+
+def _inference_idle() -> bool:
+    return inference_executor.stats()['pending'] == 0
+
+# Drafts for the suggested (topic, tone) pairs of the tweet generator routes
+draft_pool = DraftPool(_produce_transformer_drafts, _inference_idle)
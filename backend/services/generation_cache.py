@@ -0,0 +1,194 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+class MemoryCacheStore:
+    def __init__(self, max_entries: int = 1024):
+        """
+        In-process LRU store
+
+        :param max_entries: Maximum number of cached results
+        """
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Tuple[float, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: Tuple[float, Any]):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class DiskCacheStore:
+    def __init__(self, directory: str, max_entries: int = 10000):
+        """
+        LRU store of JSON files that survives restarts and is shared between workers
+
+        :param directory: Directory holding one file per cached result
+        :param max_entries: Maximum number of cached results
+        """
+        self.directory = directory
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self.evictions = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def get(self, key: str) -> Optional[Tuple[float, Any]]:
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as cache_file:
+                data = json.load(cache_file)
+            # Touch the file so eviction sees it as recently used
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return data['expires_at'], data['value']
+
+    def set(self, key: str, entry: Tuple[float, Any]):
+        expires_at, value = entry
+        path = self._path(key)
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as cache_file:
+            json.dump({'expires_at': expires_at, 'value': value}, cache_file)
+        os.replace(temp_path, path)
+        self._evict()
+
+    def delete(self, key: str):
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def __len__(self) -> int:
+        return len(self._files())
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _files(self):
+        return [name for name in os.listdir(self.directory) if name.endswith('.json')]
+
+    def _evict(self):
+        with self._lock:
+            files = self._files()
+            if len(files) <= self.max_entries:
+                return
+            paths = sorted(
+                (os.path.join(self.directory, name) for name in files),
+                key=lambda path: os.path.getmtime(path)
+            )
+            for path in paths[:len(paths) - self.max_entries]:
+                try:
+                    os.remove(path)
+                    self.evictions += 1
+                except OSError:
+                    pass
+
+class GenerationCache:
+    def __init__(self, store=None, ttl_seconds: Optional[float] = None):
+        """
+        Cache of generated content for deterministic (seeded) requests
+
+        :param store: MemoryCacheStore, DiskCacheStore or any object with get/set/delete
+        :param ttl_seconds: How long a cached result stays valid
+        """
+        self.store = store if store is not None else MemoryCacheStore()
+        self.ttl_seconds = (
+            ttl_seconds if ttl_seconds is not None
+            else float(os.getenv('GENERATION_CACHE_TTL', '86400'))
+        )
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(backend: str, model: str, prompt: Optional[str], tone: Optional[str],
+                 seed: int, max_length: int) -> str:
+        """
+        Build a cache key from everything that determines a generation
+
+        :return: Hex digest identifying the request
+        """
+        raw = json.dumps([backend, model, prompt, tone, seed, max_length])
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Look up a cached result
+
+        :param key: Key from make_key
+        :return: Cached value or None on a miss
+        """
+        entry = self.store.get(key)
+        if entry is not None and entry[0] < time.time():
+            self.store.delete(key)
+            entry = None
+
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return entry[1]
+
+    def set(self, key: str, value: Any):
+        """
+        Store a generated result
+
+        :param key: Key from make_key
+        :param value: JSON-serializable result
+        """
+        self.store.set(key, (time.time() + self.ttl_seconds, value))
+
+    def stats(self) -> Dict:
+        """
+        Report hit and miss counters
+
+        :return: Dictionary of cache statistics
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'store': type(self.store).__name__,
+                'entries': len(self.store),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0,
+                'evictions': self.store.evictions,
+                'ttl_seconds': self.ttl_seconds
+            }
+
+def create_generation_cache() -> GenerationCache:
+    """
+    Build the cache configured by GENERATION_CACHE_STORE ('memory' or 'disk')
+    """
+    max_entries = int(os.getenv('GENERATION_CACHE_MAX_ENTRIES', '1024'))
+    if os.getenv('GENERATION_CACHE_STORE', 'memory') == 'disk':
+        store = DiskCacheStore(os.getenv('GENERATION_CACHE_DIR', '.generation_cache'), max_entries)
+    else:
+        store = MemoryCacheStore(max_entries)
+    return GenerationCache(store)
+
+# Shared by every generation route
+generation_cache = create_generation_cache()
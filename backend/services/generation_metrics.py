@@ -0,0 +1,169 @@
+import json
+import logging
+import os
+import threading
+from collections import defaultdict, deque
+from typing import Dict, Optional
+
+logger = logging.getLogger('generation_metrics')
+
+# USD per 1K (prompt, completion) tokens
+OPENAI_PRICING = {
+    'gpt-3.5-turbo': (0.0005, 0.0015),
+    'gpt-4o-mini': (0.00015, 0.0006),
+    'gpt-4o': (0.0025, 0.01)
+}
+
+# Queue wait measured by whoever scheduled the current thread's work
+_queue_wait = threading.local()
+
+def set_queue_wait(seconds: float):
+    """
+    Record how long the work about to run on this thread waited to start
+    """
+    _queue_wait.seconds = seconds
+
+def pop_queue_wait() -> float:
+    """
+    Take the queue wait set for this thread, or 0 when nothing was queued
+    """
+    seconds = getattr(_queue_wait, 'seconds', 0.0)
+    _queue_wait.seconds = 0.0
+    return seconds
+
+class RollingHistogram:
+    def __init__(self, window: int = 1000):
+        """
+        Summary statistics over the most recent observations
+
+        :param window: Number of observations kept
+        """
+        self._values = deque(maxlen=window)
+
+    def observe(self, value: float):
+        self._values.append(value)
+
+    def summary(self) -> Dict:
+        values = sorted(self._values)
+        if not values:
+            return {'count': 0}
+
+        def percentile(fraction: float) -> float:
+            return values[min(len(values) - 1, int(len(values) * fraction))]
+
+        return {
+            'count': len(values),
+            'mean': sum(values) / len(values),
+            'p50': percentile(0.5),
+            'p95': percentile(0.95),
+            'p99': percentile(0.99),
+            'max': values[-1]
+        }
+
+class GenerationMetrics:
+    def __init__(self, window: Optional[int] = None, log_records: Optional[bool] = None):
+        """
+        Per-provider timing, token and cost accounting for generation calls
+
+        :param window: Observations kept per rolling histogram
+        :param log_records: Emit one structured log line per call
+        """
+        self.window = window or int(os.getenv('GENERATION_METRICS_WINDOW', '1000'))
+        self.log_records = (
+            log_records if log_records is not None
+            else os.getenv('GENERATION_METRICS_LOG', 'true').lower() == 'true'
+        )
+        # Local backends have no bill, but CPU time still costs something
+        self.local_cost_per_hour = float(os.getenv('LOCAL_COMPUTE_COST_PER_HOUR', '0'))
+
+        self._lock = threading.Lock()
+        self._histograms = defaultdict(lambda: defaultdict(lambda: RollingHistogram(self.window)))
+        self._totals = defaultdict(lambda: defaultdict(float))
+
+    def estimate_cost(self, provider: str, model: Optional[str], prompt_tokens: int,
+                      completion_tokens: int, latency: float) -> float:
+        """
+        Estimate the cost of a call in USD
+
+        :return: API price for OpenAI, compute time for local backends
+        """
+        if provider == 'openai':
+            prompt_price, completion_price = OPENAI_PRICING.get(model, OPENAI_PRICING['gpt-3.5-turbo'])
+            return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1000
+        return latency * self.local_cost_per_hour / 3600
+
+    def record(self, provider: str, operation: str, latency: float, model: Optional[str] = None,
+               queue_wait: float = 0.0, postprocess: float = 0.0, prompt_tokens: int = 0,
+               completion_tokens: int = 0, items: int = 1, error: Optional[str] = None) -> Dict:
+        """
+        Record one generation call
+
+        :param provider: Backend, e.g. 'openai', 'transformer', 'huggingface', 'markov'
+        :param operation: What was generated, e.g. 'tweet', 'thread', 'batch'
+        :param latency: Seconds spent in the model or API call
+        :param model: Model name
+        :param queue_wait: Seconds spent waiting before the call started
+        :param postprocess: Seconds spent decoding and cleaning the output
+        :param prompt_tokens: Tokens sent to the model
+        :param completion_tokens: Tokens generated
+        :param items: Tweets produced by the call
+        :param error: Error message when the call failed
+        :return: The structured record
+        """
+        cost = self.estimate_cost(provider, model, prompt_tokens, completion_tokens, latency)
+        record = {
+            'provider': provider,
+            'operation': operation,
+            'model': model,
+            'items': items,
+            'queue_wait_ms': round(queue_wait * 1000, 3),
+            'latency_ms': round(latency * 1000, 3),
+            'postprocess_ms': round(postprocess * 1000, 3),
+            'prompt_tokens': prompt_tokens,
+            'completion_tokens': completion_tokens,
+            'cost_usd': cost,
+            'error': error
+        }
+
+        with self._lock:
+            histograms = self._histograms[provider]
+            histograms['queue_wait_ms'].observe(record['queue_wait_ms'])
+            histograms['latency_ms'].observe(record['latency_ms'])
+            histograms['postprocess_ms'].observe(record['postprocess_ms'])
+            histograms['completion_tokens'].observe(completion_tokens)
+
+            totals = self._totals[provider]
+            totals['calls'] += 1
+            totals['errors'] += error is not None
+            totals['items'] += items
+            totals['prompt_tokens'] += prompt_tokens
+            totals['completion_tokens'] += completion_tokens
+            totals['cost_usd'] += cost
+
+        if self.log_records:
+            logger.info(json.dumps(record))
+        return record
+
+    def stats(self) -> Dict:
+        """
+        Report totals and rolling histograms per provider
+
+        :return: Dictionary of generation metrics
+        """
+        with self._lock:
+            report = {}
+            for provider, totals in self._totals.items():
+                items = totals['items']
+                report[provider] = {
+                    **{name: int(value) for name, value in totals.items() if name != 'cost_usd'},
+                    'cost_usd': totals['cost_usd'],
+                    'cost_per_item_usd': totals['cost_usd'] / items if items else 0,
+                    'histograms': {
+                        name: histogram.summary()
+                        for name, histogram in self._histograms[provider].items()
+                    }
+                }
+            return report
+
+# Shared by every generator backend
+generation_metrics = GenerationMetrics()
@@ -1,5 +1,8 @@
+import bisect
 import random
-import re
+from string import Formatter
+from typing import List, Optional
+from .tweet_postprocessing import clean_tweet, DEFAULT_HASHTAGS
 
 class HuggingFaceContentGenerator:
     def __init__(self):
@@ -33,66 +36,121 @@ class HuggingFaceContentGenerator:
                 "Plot twist: {topic} is the hero we didn't know we needed."
             ]
         }
-
-    def _clean_tweet(self, text, max_length=280):
-        """
-        Clean and format generated text into a tweet
-        """
-        # Remove multiple whitespaces
-        text = re.sub(r'\s+', ' ', text).strip()
         
-        # Remove URLs
-        text = re.sub(r'http\S+', '', text)
-        
-        # Truncate to max length
-        text = text[:max_length]
+        self.insights = [
+            "Driving innovation forward",
+            "Transforming the way we work",
+            "Unlocking new possibilities",
+            "Challenging the status quo",
+            "Empowering future generations"
+        ]
         
-        # Add hashtag if no hashtag exists
-        if not re.search(r'#\w+', text):
-            hashtags = ['#Innovation', '#Technology', '#AI', '#Future']
-            text += f" {random.choice(hashtags)}"
+        self.hashtags = list(DEFAULT_HASHTAGS)
         
-        return text.strip()
+        # Combination index layouts, built on first use per tone
+        self._spaces = {}
 
-    def generate_tweet(self, topic=None, tone='professional', max_length=280):
+    def generate_tweet(self, topic=None, tone='professional', max_length=280, seed=None):
         """
         Generate a tweet-like text
+        
+        The same topic, tone and seed always produce the same tweet.
         """
+        rng = random.Random(seed) if seed is not None else random
+        
         # Select topic if not provided
-        selected_topic = topic or random.choice(self.topics)
+        selected_topic = topic or rng.choice(self.topics)
         
         # Select tone templates
         tone_options = self.tone_templates.get(tone, self.tone_templates['professional'])
         
         # Generate tweet template
-        tweet_template = random.choice(tone_options)
-        
-        # Generate insights
-        insights = [
-            "Driving innovation forward",
-            "Transforming the way we work",
-            "Unlocking new possibilities",
-            "Challenging the status quo",
-            "Empowering future generations"
-        ]
+        tweet_template = rng.choice(tone_options)
         
         # Format tweet
         tweet = tweet_template.format(
             topic=selected_topic,
-            insight=random.choice(insights)
+            insight=rng.choice(self.insights)
         )
         
         # Clean and return tweet
-        return self._clean_tweet(tweet, max_length)
+        return clean_tweet(tweet, max_length, rng=rng)
+
+    def generate_unique_tweets(self, count: int, topic: Optional[str] = None, tone: str = 'professional',
+                               max_length: int = 280, seed: Optional[int] = None) -> List[str]:
+        """
+        Generate distinct tweets by drawing template combinations without replacement
+        
+        Every (template, topic, insight, hashtag) combination has an index;
+        sampling indices and decoding them costs O(count), with no retries.
+        
+        :param count: Number of tweets; capped at the number of distinct combinations
+        :param topic: Fixed topic, or None to vary the topic too
+        :param tone: Template tone
+        :param max_length: Maximum tweet length
+        :param seed: Optional seed for a reproducible selection
+        :return: Distinct tweets
+        """
+        rng = random.Random(seed) if seed is not None else random
+        templates, starts, radices, total = self._combination_space(tone, topic is None)
+        
+        tweets = []
+        for index in rng.sample(range(total), min(count, total)):
+            position = bisect.bisect_right(starts, index) - 1
+            offset = index - starts[position]
+            
+            # Mixed-radix digits: topic, insight, hashtag
+            topic_radix, insight_radix, hashtag_radix = radices[position]
+            offset, topic_digit = divmod(offset, topic_radix)
+            offset, insight_digit = divmod(offset, insight_radix)
+            hashtag_digit = offset % hashtag_radix
+            
+            tweet = templates[position].format(
+                topic=topic or self.topics[topic_digit],
+                insight=self.insights[insight_digit]
+            )
+            tweets.append(clean_tweet(tweet, max_length, hashtags=[self.hashtags[hashtag_digit]]))
+        
+        return tweets
+
+    def _combination_space(self, tone: str, vary_topic: bool):
+        """
+        Lay out the combinations of a tone's templates as one index range
+        
+        :return: (templates, start index of each template, radices per template, total)
+        """
+        templates = self.tone_templates.get(tone, self.tone_templates['professional'])
+        key = (tone, vary_topic, len(templates), len(self.topics), len(self.insights), len(self.hashtags))
+        space = self._spaces.get(key)
+        if space is not None:
+            return space
+        
+        starts, radices, total = [], [], 0
+        for template in templates:
+            fields = {name for _, name, _, _ in Formatter().parse(template) if name}
+            # A field the template does not use contributes a single choice
+            radix = (
+                len(self.topics) if vary_topic and 'topic' in fields else 1,
+                len(self.insights) if 'insight' in fields else 1,
+                len(self.hashtags) if '#' not in template else 1
+            )
+            starts.append(total)
+            radices.append(radix)
+            total += radix[0] * radix[1] * radix[2]
+        
+        space = (templates, starts, radices, total)
+        self._spaces[key] = space
+        return space
 
-    def generate_thread(self, topic=None, length=3, max_tweet_length=280):
+    def generate_thread(self, topic=None, length=3, max_tweet_length=280, seed=None):
         """
-        Generate a thread of tweets
+        Generate a thread of distinct tweets
         """
-        thread = []
-        for _ in range(length):
-            tweet = self.generate_tweet(topic, max_length=max_tweet_length)
-            thread.append(tweet)
+        thread = self.generate_unique_tweets(length, topic, max_length=max_tweet_length, seed=seed)
+        
+        # Only repeat tweets once every combination is used
+        while thread and len(thread) < length:
+            thread.extend(thread[:length - len(thread)])
         
         return thread
 
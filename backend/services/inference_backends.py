@@ -0,0 +1,66 @@
+import os
+import torch
+from torch import nn
+from transformers import AutoModelForCausalLM
+from transformers.pytorch_utils import Conv1D
+
+SUPPORTED_BACKENDS = ('torch', 'int8', 'onnx')
+
+def load_causal_lm(model_name: str, backend: str = 'torch', device=None):
+    """
+    Load a causal language model on the selected CPU backend
+
+    :param model_name: Hugging Face model name
+    :param backend: 'torch' (fp32), 'int8' (dynamic quantization) or 'onnx' (ONNX Runtime)
+    :param device: Torch device for the torch-based backends
+    :return: Model exposing generate()
+    """
+    device = device or torch.device('cpu')
+
+    if backend == 'torch':
+        return AutoModelForCausalLM.from_pretrained(model_name).to(device)
+
+    if backend == 'int8':
+        model = AutoModelForCausalLM.from_pretrained(model_name).to(device)
+        model.eval()
+
+        # GPT-2 style models use Conv1D projections, which dynamic quantization skips
+        _replace_conv1d_with_linear(model)
+        return torch.ao.quantization.quantize_dynamic(model, {nn.Linear}, dtype=torch.qint8)
+
+    if backend == 'onnx':
+        return _load_onnx_model(model_name)
+
+    raise ValueError(
+        f"Unknown transformer backend '{backend}', expected one of {', '.join(SUPPORTED_BACKENDS)}"
+    )
+
+def _load_onnx_model(model_name: str):
+    try:
+        from optimum.onnxruntime import ORTModelForCausalLM
+    except ImportError as e:
+        raise ImportError(
+            "The 'onnx' backend requires optimum[onnxruntime] to be installed"
+        ) from e
+
+    # Export once and reuse the graph on later startups
+    export_root = os.getenv('ONNX_EXPORT_DIR', 'onnx_models')
+    export_dir = os.path.join(export_root, model_name.replace('/', '--'))
+    if os.path.exists(os.path.join(export_dir, 'model.onnx')):
+        return ORTModelForCausalLM.from_pretrained(export_dir, use_cache=True)
+
+    model = ORTModelForCausalLM.from_pretrained(model_name, export=True, use_cache=True)
+    model.save_pretrained(export_dir)
+    return model
+
+def _replace_conv1d_with_linear(module: nn.Module):
+    for name, child in module.named_children():
+        if isinstance(child, Conv1D):
+            # Conv1D stores its weight as (in_features, out_features)
+            in_features, out_features = child.weight.shape
+            linear = nn.Linear(in_features, out_features)
+            linear.weight.data = child.weight.data.t().contiguous()
+            linear.bias.data = child.bias.data
+            setattr(module, name, linear)
+        else:
+            _replace_conv1d_with_linear(child)
@@ -0,0 +1,131 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+from .generation_metrics import set_queue_wait
+
+class InferenceQueueFull(Exception):
+    """
+    Raised when the inference queue cannot accept more work
+    """
+
+class InferenceExecutor:
+    def __init__(self, max_workers: Optional[int] = None, max_queue_size: Optional[int] = None):
+        """
+        Dedicated worker pool that keeps model inference off the event loop
+
+        :param max_workers: Number of inference threads
+        :param max_queue_size: Requests allowed to wait beyond the running ones
+        """
+        self.max_workers = (
+            max_workers if max_workers is not None
+            else int(os.getenv('INFERENCE_WORKERS', '2'))
+        )
+        self.max_queue_size = (
+            max_queue_size if max_queue_size is not None
+            else int(os.getenv('INFERENCE_MAX_QUEUE', '32'))
+        )
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix='inference'
+        )
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._rejected = 0
+        self._completed = 0
+
+    @property
+    def capacity(self) -> int:
+        return self.max_workers + self.max_queue_size
+
+    async def run(self, func: Callable, *args, **kwargs):
+        """
+        Run a blocking inference call in the worker pool and await its result
+
+        :param func: Blocking callable, e.g. generator.generate_tweet
+        :return: The callable's return value
+        :raises InferenceQueueFull: When the bounded queue is full
+        """
+        # The slot is released when the job finishes, not when the caller
+        # stops waiting, so a cancelled request cannot leak queue capacity
+        return await asyncio.wrap_future(self.submit(func, *args, **kwargs))
+
+    async def await_submitted(self, submit: Callable[..., Future], *args, **kwargs):
+        """
+        Await work handed to another engine (e.g. the batching engine),
+        counting it against the same bounded queue
+
+        :param submit: Callable returning a concurrent.futures.Future and accepting
+                       on_done, called by the engine once it has finished the job
+        :return: The future's result
+        :raises InferenceQueueFull: When the bounded queue is full
+        """
+        self._reserve()
+        try:
+            # Cancelling the caller's future must not free the slot while
+            # the engine is still computing, so the engine releases it
+            future = submit(*args, on_done=self._release, **kwargs)
+        except BaseException:
+            self._release()
+            raise
+        return await asyncio.wrap_future(future)
+
+    def submit(self, func: Callable, *args, **kwargs) -> Future:
+        """
+        Submit a blocking inference call from synchronous code
+
+        :param func: Blocking callable
+        :return: Future resolved with the callable's result
+        :raises InferenceQueueFull: When the bounded queue is full
+        """
+        self._reserve()
+        future = self._executor.submit(self._call, time.perf_counter(), func, *args, **kwargs)
+        future.add_done_callback(lambda _: self._release())
+        return future
+
+    def stats(self) -> Dict:
+        """
+        Report queue occupancy and rejections
+
+        :return: Dictionary of executor statistics
+        """
+        with self._lock:
+            return {
+                'max_workers': self.max_workers,
+                'max_queue_size': self.max_queue_size,
+                'pending': self._pending,
+                'completed': self._completed,
+                'rejected': self._rejected
+            }
+
+    def shutdown(self):
+        """
+        Stop accepting work and wait for running inference to finish
+        """
+        self._executor.shutdown(wait=True)
+
+    @staticmethod
+    def _call(queued_at: float, func: Callable, *args, **kwargs):
+        # Runs on the worker; generators report this wait with their metrics
+        set_queue_wait(time.perf_counter() - queued_at)
+        return func(*args, **kwargs)
+
+    def _reserve(self):
+        with self._lock:
+            if self._pending >= self.capacity:
+                self._rejected += 1
+                raise InferenceQueueFull(
+                    "Tweet generation is at capacity, please retry shortly"
+                )
+            self._pending += 1
+
+    def _release(self):
+        with self._lock:
+            self._pending -= 1
+            self._completed += 1
+
+# Shared by every router that runs model inference
+inference_executor = InferenceExecutor()
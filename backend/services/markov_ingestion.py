@@ -0,0 +1,163 @@
+import os
+import re
+import threading
+from typing import Dict, Iterable, Optional, Union
+import markovify
+
+# Parts of a tweet that should not become Markov states
+RETWEET_PATTERN = re.compile(r'^RT @\w+:\s*')
+NOISE_PATTERN = re.compile(r'https?://\S+|@\w+')
+
+class AccountMarkovIngestor:
+    def __init__(self, state_size: int = 2, max_states: Optional[int] = None,
+                 history_weight: Optional[float] = None, min_state_weight: Optional[float] = None):
+        """
+        Per-account Markov models that learn from collected tweets incrementally
+
+        New tweets are trained into a small model and merged into the account's
+        model with markovify.combine, so an update costs the size of the model,
+        not of the whole history.
+
+        :param state_size: Words of context per chain state
+        :param max_states: States kept per account; the rarest are pruned beyond this
+        :param history_weight: Weight of the existing model when merging (below 1 fades old text)
+        :param min_state_weight: States seen less than this are pruned after each merge
+        """
+        self.state_size = state_size
+        self.max_states = max_states or int(os.getenv('MARKOV_MAX_STATES', '50000'))
+        self.history_weight = (
+            history_weight if history_weight is not None
+            else float(os.getenv('MARKOV_HISTORY_WEIGHT', '1.0'))
+        )
+        self.min_state_weight = (
+            min_state_weight if min_state_weight is not None
+            else float(os.getenv('MARKOV_MIN_STATE_WEIGHT', '0'))
+        )
+
+        self._models: Dict[str, markovify.NewlineText] = {}
+        self._compiled: Dict[str, markovify.NewlineText] = {}
+        self._last_ids: Dict[str, int] = {}
+        self._ingested: Dict[str, int] = {}
+        self._pruned: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def ingest(self, account: str, tweets: Iterable[Union[dict, str]]) -> int:
+        """
+        Merge new tweets into an account's model
+
+        Tweets given as dicts with an 'id' are skipped when that id was already
+        ingested, so the same timeline can be fed repeatedly.
+
+        :param account: Account the tweets belong to
+        :param tweets: Tweet dicts with 'text' (and optionally 'id'), or plain strings
+        :return: Number of tweets merged
+        """
+        last_id = self._last_ids.get(account, 0)
+        newest_id = last_id
+        lines = []
+        for tweet in tweets:
+            if isinstance(tweet, dict):
+                tweet_id = tweet.get('id') or 0
+                if tweet_id and tweet_id <= last_id:
+                    continue
+                newest_id = max(newest_id, tweet_id)
+                text = tweet.get('text') or ''
+            else:
+                text = tweet
+            text = ' '.join(NOISE_PATTERN.sub('', RETWEET_PATTERN.sub('', text)).split())
+            if text:
+                lines.append(text)
+
+        if not lines:
+            return 0
+
+        try:
+            update = markovify.NewlineText(
+                '\n'.join(lines), state_size=self.state_size, retain_original=False
+            )
+        except Exception as e:
+            print(f"🚨 Markov ingestion error for {account}: {e}")
+            return 0
+
+        with self._lock:
+            current = self._models.get(account)
+            if current is not None:
+                update = markovify.combine([current, update], [self.history_weight, 1])
+            model, pruned = self._prune(update)
+
+            self._models[account] = model
+            self._compiled.pop(account, None)
+            self._last_ids[account] = newest_id
+            self._ingested[account] = self._ingested.get(account, 0) + len(lines)
+            self._pruned[account] = self._pruned.get(account, 0) + pruned
+
+        return len(lines)
+
+    def get_model(self, account: str) -> Optional[markovify.NewlineText]:
+        """
+        Get a compiled model for walking, or None if nothing was ingested
+
+        :param account: Account name
+        :return: Compiled model, rebuilt only after new ingestion
+        """
+        with self._lock:
+            compiled = self._compiled.get(account)
+            if compiled is None and account in self._models:
+                compiled = self._models[account].compile()
+                self._compiled[account] = compiled
+            return compiled
+
+    def stats(self) -> Dict:
+        """
+        Report per-account model sizes
+
+        :return: Dictionary of ingestion statistics
+        """
+        with self._lock:
+            return {
+                account: {
+                    'states': len(model.chain.model),
+                    'tweets_ingested': self._ingested.get(account, 0),
+                    'states_pruned': self._pruned.get(account, 0),
+                    'last_id': self._last_ids.get(account)
+                }
+                for account, model in self._models.items()
+            }
+
+    def _prune(self, model: markovify.NewlineText):
+        """
+        Drop rare states until the model fits, keeping every walk well-defined
+
+        :return: (pruned model, number of states removed)
+        """
+        chain = model.chain.model
+        begin = tuple([markovify.chain.BEGIN] * self.state_size)
+        totals = {state: sum(options.values()) for state, options in chain.items()}
+
+        keep = {
+            state for state, total in totals.items()
+            if total >= self.min_state_weight or state == begin
+        }
+        if len(keep) > self.max_states:
+            ranked = sorted(keep, key=lambda state: totals[state], reverse=True)
+            keep = set(ranked[:self.max_states - 1]) | {begin}
+
+        if len(keep) == len(chain):
+            return model, 0
+
+        # A transition into a pruned state ends the sentence instead. Every
+        # state could reach the end before pruning, so walks still terminate
+        end = markovify.chain.END
+        pruned_chain = {}
+        for state in keep:
+            options = {}
+            for word, weight in chain[state].items():
+                if word != end and state[1:] + (word,) not in keep:
+                    word = end
+                options[word] = options.get(word, 0) + weight
+            pruned_chain[state] = options
+
+        return markovify.NewlineText.from_chain(pruned_chain), len(chain) - len(pruned_chain)
+
+# Shared by AnalyticsService and ContentGenerator
+markov_ingestor = AccountMarkovIngestor()
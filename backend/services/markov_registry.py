@@ -0,0 +1,117 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Sequence
+import markovify
+
+class MarkovModelRegistry:
+    def __init__(self, model_dir: Optional[str] = None, max_models: Optional[int] = None,
+                 state_size: int = 2):
+        """
+        Compiled Markov models built once per corpus and reused across calls
+
+        :param model_dir: Directory for JSON snapshots of built models, None to keep them in memory only
+        :param max_models: Models kept in memory, least recently used first out
+        :param state_size: Words of context per chain state
+        """
+        self.model_dir = model_dir if model_dir is not None else os.getenv('MARKOV_MODEL_DIR')
+        self.max_models = max_models or int(os.getenv('MARKOV_MAX_MODELS', '256'))
+        self.state_size = state_size
+
+        self._models: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.built = 0
+        self.loaded = 0
+
+        if self.model_dir:
+            os.makedirs(self.model_dir, exist_ok=True)
+
+    def get(self, key: str, corpus: Sequence[str], digest: Optional[str] = None) -> markovify.Text:
+        """
+        Get the compiled model for a corpus, building it on first use
+
+        :param key: Name of the corpus, e.g. a topic
+        :param corpus: Sentences the model is trained on
+        :param digest: The corpus' digest() when the caller already has it;
+                       passing it makes a cache hit independent of corpus size
+        :return: Compiled markovify.Text
+        """
+        # Keyed on the exact corpus content, so edited corpora rebuild
+        entry = digest or self.digest(key, corpus)
+        with self._lock:
+            model = self._models.get(entry)
+            if model is not None:
+                self._models.move_to_end(entry)
+                self.hits += 1
+                return model
+
+        model = self._load(entry)
+        if model is None:
+            model = markovify.Text(list(corpus), state_size=self.state_size).compile(inplace=True)
+            self._save(entry, model)
+            with self._lock:
+                self.built += 1
+        else:
+            with self._lock:
+                self.loaded += 1
+
+        with self._lock:
+            self._models[entry] = model
+            while len(self._models) > self.max_models:
+                self._models.popitem(last=False)
+        return model
+
+    def stats(self) -> Dict:
+        """
+        Report cache usage
+
+        :return: Dictionary of registry statistics
+        """
+        with self._lock:
+            return {
+                'models': len(self._models),
+                'max_models': self.max_models,
+                'hits': self.hits,
+                'built': self.built,
+                'loaded_from_disk': self.loaded,
+                'model_dir': self.model_dir
+            }
+
+    def digest(self, key: str, corpus: Sequence[str]) -> str:
+        """
+        Content hash identifying a corpus; compute it once per corpus version
+
+        :return: Hex sha256 of the key, state size and sentences
+        """
+        raw = json.dumps([key, self.state_size, list(corpus)])
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.model_dir, f"{digest}.json")
+
+    def _load(self, digest: str) -> Optional[markovify.Text]:
+        if not self.model_dir:
+            return None
+        try:
+            with open(self._path(digest), 'r', encoding='utf-8') as model_file:
+                return markovify.Text.from_json(model_file.read())
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _save(self, digest: str, model: markovify.Text):
+        if not self.model_dir:
+            return
+        path = self._path(digest)
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as model_file:
+                model_file.write(model.to_json())
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"🚨 Could not save Markov model: {e}")
+
+# Shared by every ContentGenerator
+markov_registry = MarkovModelRegistry()
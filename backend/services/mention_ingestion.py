@@ -0,0 +1,286 @@
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+from .sentiment_service import SentimentService
+
+# Window name -> (span in seconds, ring buffer slots); a slot is span / slots wide
+SENTIMENT_WINDOWS = {
+    '1h': (3600, 60),
+    '24h': (86400, 144),
+    '7d': (604800, 168)
+}
+
+# Mentions per mentions_timeline page, the API maximum
+PAGE_SIZE = 200
+
+class RollingWindow:
+    def __init__(self, span_seconds: float, slots: int):
+        """
+        Sentiment counts over the last span_seconds, in a fixed-size ring buffer
+
+        Running totals are updated as values arrive and as slots expire, so
+        reading them never rescans history. Expiry has the granularity of one slot.
+
+        :param span_seconds: Length of the window
+        :param slots: Ring buffer size
+        """
+        self.slots = slots
+        self.slot_seconds = span_seconds / slots
+        self._counts = [0] * slots
+        self._sums = [0.0] * slots
+        self._positive = [0] * slots
+        self._negative = [0] * slots
+        # Index (time // slot_seconds) of the newest slot
+        self._head = 0
+        self.count = 0
+        self.compound_sum = 0.0
+        self.positive = 0
+        self.negative = 0
+
+    def add(self, timestamp: float, compound: float):
+        """
+        Count one scored mention
+
+        :param timestamp: When the mention was posted (epoch seconds)
+        :param compound: VADER compound score
+        """
+        index = int(timestamp // self.slot_seconds)
+        self._advance(index)
+        if index <= self._head - self.slots:
+            # Older than the window
+            return
+        slot = index % self.slots
+        self._counts[slot] += 1
+        self._sums[slot] += compound
+        self.count += 1
+        self.compound_sum += compound
+        if compound >= 0.05:
+            self._positive[slot] += 1
+            self.positive += 1
+        elif compound <= -0.05:
+            self._negative[slot] += 1
+            self.negative += 1
+
+    def snapshot(self, now: float) -> Dict:
+        """
+        Current totals of the window
+
+        :param now: Current time (epoch seconds)
+        :return: Mention counts and mean compound score
+        """
+        self._advance(int(now // self.slot_seconds))
+        return {
+            'count': self.count,
+            'mean_compound': self.compound_sum / self.count if self.count else 0.0,
+            'positive': self.positive,
+            'negative': self.negative,
+            'neutral': self.count - self.positive - self.negative
+        }
+
+    def _advance(self, index: int):
+        if index <= self._head:
+            return
+        # Expire at most one full turn of the ring
+        for expired in range(max(self._head + 1, index - self.slots + 1), index + 1):
+            slot = expired % self.slots
+            self.count -= self._counts[slot]
+            self.compound_sum -= self._sums[slot]
+            self.positive -= self._positive[slot]
+            self.negative -= self._negative[slot]
+            self._counts[slot] = 0
+            self._sums[slot] = 0.0
+            self._positive[slot] = 0
+            self._negative[slot] = 0
+        if self.count == 0:
+            # Keep float error from accumulating across empty periods
+            self.compound_sum = 0.0
+        self._head = index
+
+class MentionIngestor:
+    def __init__(self, account_manager, sentiment_service: Optional[SentimentService] = None,
+                 poll_interval: Optional[float] = None, max_pages: Optional[int] = None,
+                 on_mentions: Optional[Callable[[str, List], Optional[List]]] = None):
+        """
+        Poll each managed account's mentions and keep rolling sentiment aggregates
+
+        :param account_manager: AccountManager holding the API clients
+        :param sentiment_service: Scores mention batches; a new service by default
+        :param poll_interval: Seconds between polling passes over all accounts
+        :param max_pages: Mention pages (PAGE_SIZE each) fetched per account and poll
+        :param on_mentions: Called with (username, mentions) for every new batch, e.g. auto-reply.
+                            Not called on an account's first poll, which only sets the
+                            cursor, so a restart does not answer old mentions again.
+                            Mentions it returns are offered again with the next batch
+        """
+        self.account_manager = account_manager
+        self.sentiment_service = sentiment_service or SentimentService()
+        self.poll_interval = (
+            poll_interval if poll_interval is not None
+            else float(os.getenv('MENTION_POLL_INTERVAL', '60'))
+        )
+        self.max_pages = max_pages or int(os.getenv('MENTION_MAX_PAGES', '5'))
+        self.on_mentions = on_mentions
+
+        self._since_ids: Dict[str, int] = {}
+        # username -> (max_id to resume paging at, newest id seen) while a
+        # backlog larger than max_pages is read over several polls
+        self._resume: Dict[str, Tuple[int, int]] = {}
+        # username -> mentions on_mentions refused, newest first
+        self._held: Dict[str, List] = {}
+        self._windows: Dict[str, Dict[str, RollingWindow]] = {}
+        self._ingested: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+
+    def poll_account(self, username: str) -> int:
+        """
+        Fetch and score the mentions an account received since the last poll
+
+        :param username: Managed account username
+        :return: Number of new mentions ingested
+        """
+        api = self.account_manager.get_account(username)
+        if not api:
+            return 0
+
+        since_id = self._since_ids.get(username)
+        resume = self._resume.get(username)
+        try:
+            mentions, max_id = self._fetch_mentions(api, since_id, resume[0] if resume else None)
+        except Exception as e:
+            print(f"🚨 Mention polling error for {username}: {e}")
+            return 0
+        if not mentions:
+            if resume:
+                with self._lock:
+                    self._advance(username, resume[1], None)
+            if self._held.get(username):
+                self._deliver(username, [])
+            return 0
+
+        texts = [getattr(mention, 'full_text', None) or mention.text for mention in mentions]
+        scores = self.sentiment_service.batch_sentiment_analysis(texts, mode='vader')
+
+        with self._lock:
+            windows = self._windows.setdefault(username, {
+                name: RollingWindow(span, slots) for name, (span, slots) in SENTIMENT_WINDOWS.items()
+            })
+            for mention, score in zip(mentions, scores):
+                created_at = mention.created_at.timestamp() if mention.created_at else time.time()
+                for window in windows.values():
+                    window.add(created_at, score['vader_compound'])
+            # Only advance the cursor once the batch is counted
+            newest = max(mention.id for mention in mentions)
+            self._advance(username, max(newest, resume[1]) if resume else newest, max_id)
+            self._ingested[username] = self._ingested.get(username, 0) + len(mentions)
+
+        if since_id:
+            self._deliver(username, mentions)
+
+        return len(mentions)
+
+    def poll_all(self) -> int:
+        """
+        Poll every managed account once
+
+        :return: Number of new mentions ingested
+        """
+        total = 0
+        for username in self.account_manager.get_accounts():
+            # One failing account, scorer or callback must not stop the polling thread
+            try:
+                total += self.poll_account(username)
+            except Exception as e:
+                print(f"🚨 Mention ingestion error for {username}: {e}")
+        return total
+
+    def dashboard(self, username: Optional[str] = None) -> Dict:
+        """
+        Rolling sentiment per account, read from the running totals
+
+        :param username: Single account, or None for all accounts
+        :return: Per-account window totals and ingestion cursor
+        """
+        now = time.time()
+        with self._lock:
+            usernames = [username] if username else list(self._windows)
+            return {
+                name: {
+                    'windows': {
+                        window_name: window.snapshot(now)
+                        for window_name, window in self._windows[name].items()
+                    },
+                    'mentions_ingested': self._ingested.get(name, 0),
+                    'since_id': self._since_ids.get(name)
+                }
+                for name in usernames if name in self._windows
+            }
+
+    def start(self):
+        """
+        Start the background polling thread
+        """
+        if self._worker is None or not self._worker.is_alive():
+            self._stopped.clear()
+            self._worker = threading.Thread(target=self._run, name='mention-ingestion', daemon=True)
+            self._worker.start()
+
+    def shutdown(self):
+        """
+        Stop polling after the current pass
+        """
+        self._stopped.set()
+
+    def _deliver(self, username: str, mentions: List):
+        if not self.on_mentions:
+            return
+        # The cursor is already past held mentions, so they are kept here
+        # rather than fetched and counted again
+        batch = mentions + self._held.pop(username, [])
+        refused = self.on_mentions(username, batch) or []
+        limit = self.max_pages * PAGE_SIZE
+        if len(refused) > limit:
+            print(f"🚨 Dropping {len(refused) - limit} refused mentions for {username}")
+            refused = refused[:limit]
+        if refused:
+            self._held[username] = refused
+
+    def _advance(self, username: str, newest: int, max_id: Optional[int]):
+        if max_id is None:
+            self._since_ids[username] = newest
+            self._resume.pop(username, None)
+        else:
+            # Keep since_id so the next poll continues below max_id
+            self._resume[username] = (max_id, newest)
+
+    def _fetch_mentions(self, api, since_id: Optional[int],
+                        max_id: Optional[int] = None) -> Tuple[List, Optional[int]]:
+        """
+        Page backwards from max_id (or the newest mention) until since_id is reached
+
+        Without a cursor only the newest page is read, so a first poll does
+        not backfill the whole history.
+
+        :return: The mentions, and the max_id to resume at if max_pages ran out first
+        """
+        mentions = []
+        for _ in range(self.max_pages if since_id else 1):
+            page = api.mentions_timeline(
+                since_id=since_id, max_id=max_id, count=PAGE_SIZE, tweet_mode='extended'
+            )
+            mentions.extend(page)
+            # A short page is the last one; saves a call against the rate limit
+            if len(page) < PAGE_SIZE:
+                return mentions, None
+            max_id = min(mention.id for mention in page) - 1
+        if not since_id:
+            return mentions, None
+        print(f"Mention backlog exceeds {self.max_pages} pages, resuming below {max_id} next poll")
+        return mentions, max_id
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self.poll_all()
+            self._stopped.wait(self.poll_interval)
@@ -0,0 +1,197 @@
+import asyncio
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+from .transformer_generator import TransformerTweetGenerator
+from .batching_engine import BatchingInferenceEngine
+
+# Fixed lead-in for each tone; the topic is appended per request
+TONE_PROMPT_PREFIXES = {
+    'professional': "A professional insight about",
+    'casual': "A casual take on",
+    'witty': "A witty observation about",
+    'inspirational': "An inspirational message related to"
+}
+
+class ModelRegistry:
+    def __init__(self, default_model: Optional[str] = None, load_retry_seconds: Optional[float] = None):
+        """
+        Process-wide registry that loads each transformer model once
+
+        :param default_model: Model used when callers do not name one
+        :param load_retry_seconds: How long a failed load is reused before loading is retried
+        """
+        self.default_model = default_model or os.getenv('TRANSFORMER_MODEL', 'distilgpt2')
+        self.load_retry_seconds = (
+            load_retry_seconds if load_retry_seconds is not None
+            else float(os.getenv('MODEL_LOAD_RETRY_SECONDS', '30'))
+        )
+
+        # Only successfully loaded models
+        self._generators: Dict[str, TransformerTweetGenerator] = {}
+        # model name -> (generator without a model, failed at)
+        self._failed: Dict[str, tuple] = {}
+        self._engines: Dict[str, BatchingInferenceEngine] = {}
+        self._prompt_prefixes: List[str] = []
+        self._lock = threading.Lock()
+        self._load_locks: Dict[str, threading.Lock] = {}
+
+    def get_generator(self, model_name: Optional[str] = None) -> TransformerTweetGenerator:
+        """
+        Get the shared generator for a model, loading it on first use
+
+        :param model_name: Hugging Face model name
+        :return: Shared TransformerTweetGenerator
+        """
+        model_name = model_name or self.default_model
+        generator = self._generators.get(model_name)
+        if generator is not None:
+            return generator
+
+        # Concurrent callers of the same model wait for a single load
+        with self._lock:
+            load_lock = self._load_locks.setdefault(model_name, threading.Lock())
+
+        with load_lock:
+            generator = self._generators.get(model_name)
+            if generator is not None:
+                return generator
+
+            # A failed load serves its fallback output until the retry delay passes
+            failed = self._failed.get(model_name)
+            if failed is not None and time.monotonic() - failed[1] < self.load_retry_seconds:
+                return failed[0]
+
+            generator = TransformerTweetGenerator(model_name)
+            with self._lock:
+                if generator.model is None:
+                    self._failed[model_name] = (generator, time.monotonic())
+                    return generator
+                self._failed.pop(model_name, None)
+                if generator.prefix_cache:
+                    generator.prefix_cache.register(*self._prompt_prefixes)
+                self._generators[model_name] = generator
+
+        return generator
+
+    def get_engine(self, model_name: Optional[str] = None) -> BatchingInferenceEngine:
+        """
+        Get the shared batching engine for a model
+
+        :param model_name: Hugging Face model name
+        :return: Shared BatchingInferenceEngine
+        """
+        model_name = model_name or self.default_model
+        engine = self._engines.get(model_name)
+        if engine is not None:
+            return engine
+
+        generator = self.get_generator(model_name)
+        with self._lock:
+            engine = self._engines.setdefault(model_name, BatchingInferenceEngine(generator))
+            # Picks up the loaded model once a failed load is retried successfully
+            engine.generator = generator
+        return engine
+
+    def get_loaded(self, model_name: Optional[str] = None) -> Optional[TransformerTweetGenerator]:
+        """
+        Get a generator only if it is already loaded
+
+        :param model_name: Hugging Face model name
+        :return: Shared generator or None
+        """
+        return self._generators.get(model_name or self.default_model)
+
+    async def aget_generator(self, model_name: Optional[str] = None) -> TransformerTweetGenerator:
+        """
+        Async variant of get_generator that never loads on the event loop
+        """
+        if self.is_ready(model_name):
+            return self.get_generator(model_name)
+        return await asyncio.to_thread(self.get_generator, model_name)
+
+    async def aget_engine(self, model_name: Optional[str] = None) -> BatchingInferenceEngine:
+        """
+        Async variant of get_engine that never loads on the event loop
+        """
+        if self.is_ready(model_name):
+            return self.get_engine(model_name)
+        return await asyncio.to_thread(self.get_engine, model_name)
+
+    def register_prompt_prefixes(self, *prefixes: str):
+        """
+        Register fixed prompt prefixes on current and future generators
+
+        :param prefixes: Prompt prefixes worth caching
+        """
+        with self._lock:
+            self._prompt_prefixes.extend(prefixes)
+            generators = list(self._generators.values())
+
+        for generator in generators:
+            if generator.prefix_cache:
+                generator.prefix_cache.register(*prefixes)
+
+    def warm_up(self, model_names: Optional[List[str]] = None,
+                background: bool = True) -> Optional[threading.Thread]:
+        """
+        Load models ahead of the first request
+
+        :param model_names: Models to load, defaults to the default model
+        :param background: Load in a daemon thread instead of blocking
+        :return: The warm-up thread when loading in the background
+        """
+        model_names = model_names or [self.default_model]
+
+        def load():
+            for model_name in model_names:
+                self.get_generator(model_name)
+
+        if not background:
+            load()
+            return None
+
+        thread = threading.Thread(target=load, name='model-warm-up', daemon=True)
+        thread.start()
+        return thread
+
+    def is_ready(self, model_name: Optional[str] = None) -> bool:
+        """
+        Check whether a model has finished loading
+
+        :param model_name: Hugging Face model name
+        :return: True once the model is loaded; False while loading or after a failed load
+        """
+        return (model_name or self.default_model) in self._generators
+
+    def status(self) -> Dict:
+        """
+        Describe loaded models
+
+        :return: Dictionary of model load status
+        """
+        with self._lock:
+            return {
+                'default_model': self.default_model,
+                'ready': self.default_model in self._generators,
+                'models': {
+                    **{name: {'available': False} for name in self._failed},
+                    **{name: {'available': True} for name in self._generators}
+                }
+            }
+
+    def shutdown(self):
+        """
+        Stop every batching engine
+        """
+        with self._lock:
+            engines = list(self._engines.values())
+            self._engines.clear()
+
+        for engine in engines:
+            engine.shutdown()
+
+# Shared by every router that needs a transformer model
+model_registry = ModelRegistry()
+model_registry.register_prompt_prefixes(*TONE_PROMPT_PREFIXES.values())
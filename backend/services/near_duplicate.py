@@ -0,0 +1,211 @@
+import os
+import re
+import threading
+import zlib
+from collections import deque
+from typing import Dict, List, Optional
+import numpy as np
+
+URL_PATTERN = re.compile(r'https?://\S+')
+
+# MinHash signature layout: BANDS x ROWS hash values
+BANDS = 10
+ROWS = 3
+NUM_HASHES = BANDS * ROWS
+
+# Fixed multiply-shift hash family, so signatures are stable across restarts
+_generator = np.random.default_rng(20240601)
+_MULTIPLIERS = _generator.integers(1, 2 ** 63, NUM_HASHES, dtype=np.uint64) | np.uint64(1)
+_OFFSETS = _generator.integers(0, 2 ** 63, NUM_HASHES, dtype=np.uint64)
+
+def minhash_signature(text: str, shingle_size: int = 5) -> np.ndarray:
+    """
+    MinHash signature of a text's character shingles
+
+    The share of equal positions in two signatures estimates the Jaccard
+    similarity of the texts' shingle sets.
+
+    :param text: Text to sign
+    :param shingle_size: Characters per shingle
+    :return: NUM_HASHES uint32 values
+    """
+    # Shortened URLs differ on every post, so they are not content
+    normalized = ' '.join(URL_PATTERN.sub('', text.lower()).split())
+    shingles = {
+        normalized[i:i + shingle_size]
+        for i in range(max(1, len(normalized) - shingle_size + 1))
+    }
+    hashes = np.fromiter(
+        (zlib.crc32(shingle.encode('utf-8')) for shingle in shingles),
+        dtype=np.uint64,
+        count=len(shingles)
+    )
+    permuted = (hashes[:, None] * _MULTIPLIERS + _OFFSETS) >> np.uint64(32)
+    return permuted.min(axis=0).astype(np.uint32)
+
+class NearDuplicateIndex:
+    def __init__(self, threshold: Optional[float] = None, max_entries: Optional[int] = None):
+        """
+        Per-account MinHash LSH index answering "was something like this posted or scheduled?"
+
+        Signatures are split into bands; only entries sharing a whole band with
+        the draft are compared, so a lookup is a few dict probes however large
+        the index grows.
+
+        :param threshold: Estimated Jaccard similarity (0-1) from which a draft counts as a duplicate
+        :param max_entries: Signatures kept per account, oldest evicted first
+        """
+        self.threshold = (
+            threshold if threshold is not None
+            else float(os.getenv('NEAR_DUPLICATE_THRESHOLD', '0.7'))
+        )
+        self.max_entries = max_entries or int(os.getenv('NEAR_DUPLICATE_MAX_ENTRIES', '500000'))
+
+        self._lock = threading.Lock()
+        # account -> one {band value: entry id, or list of ids on collisions} table per band
+        self._tables: Dict[str, List[Dict[int, object]]] = {}
+        # account -> entry ids, oldest first; removed ids stay until evicted or compacted
+        self._order: Dict[str, deque] = {}
+        # account -> live entries
+        self._sizes: Dict[str, int] = {}
+        # entry id -> (signature bytes, text preview, ref)
+        self._entries: Dict[int, tuple] = {}
+        self._refs: Dict[tuple, int] = {}
+        self._next_id = 0
+        self.checks = 0
+        self.duplicates = 0
+
+    def find(self, account: str, text: str) -> Optional[Dict]:
+        """
+        Look for a near-duplicate of a draft
+
+        :param account: Account the draft would be posted from
+        :param text: Draft text
+        :return: The most similar match with its similarity, or None
+        """
+        signature = minhash_signature(text)
+        with self._lock:
+            self.checks += 1
+            match = self._closest(account, signature)
+            if match is not None:
+                self.duplicates += 1
+            return match
+
+    def add(self, account: str, text: str, ref: Optional[str] = None) -> int:
+        """
+        Remember posted or scheduled content
+
+        :param account: Account the content belongs to
+        :param text: Content text
+        :param ref: Optional handle for remove(), e.g. a scheduler job id; replaces an earlier entry with the same ref
+        :return: Entry id
+        """
+        signature = minhash_signature(text)
+        with self._lock:
+            if ref is not None and (account, ref) in self._refs:
+                self._discard(account, self._refs[(account, ref)])
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = (signature.tobytes(), text[:80], ref)
+            if ref is not None:
+                self._refs[(account, ref)] = entry_id
+
+            tables = self._tables.setdefault(account, [{} for _ in range(BANDS)])
+            for table, band in zip(tables, self._bands(signature)):
+                # Most bands are unique, so a bare id avoids a list per bucket
+                bucket = table.get(band)
+                if bucket is None:
+                    table[band] = entry_id
+                elif isinstance(bucket, list):
+                    bucket.append(entry_id)
+                else:
+                    table[band] = [bucket, entry_id]
+
+            order = self._order.setdefault(account, deque())
+            order.append(entry_id)
+            self._sizes[account] = self._sizes.get(account, 0) + 1
+            while self._sizes[account] > self.max_entries:
+                oldest = order.popleft()
+                if oldest in self._entries:
+                    self._drop(account, oldest)
+            return entry_id
+
+    def remove(self, account: str, ref: str) -> bool:
+        """
+        Forget content added with a ref, e.g. a cancelled scheduled tweet
+
+        :return: True if an entry was removed
+        """
+        with self._lock:
+            entry_id = self._refs.get((account, ref))
+            if entry_id is None:
+                return False
+            self._discard(account, entry_id)
+            return True
+
+    def stats(self) -> Dict:
+        """
+        Report index size and duplicate rate
+
+        :return: Dictionary of index statistics
+        """
+        with self._lock:
+            return {
+                'threshold': self.threshold,
+                'entries': len(self._entries),
+                'accounts': len(self._order),
+                'checks': self.checks,
+                'duplicates': self.duplicates,
+                'duplicate_rate': self.duplicates / self.checks if self.checks else 0
+            }
+
+    @staticmethod
+    def _bands(signature: np.ndarray) -> List[int]:
+        # In-memory keys only, so the per-process string hash is fine
+        return [hash(band.tobytes()) for band in signature.reshape(BANDS, ROWS)]
+
+    def _closest(self, account: str, signature: np.ndarray) -> Optional[Dict]:
+        tables = self._tables.get(account)
+        if not tables:
+            return None
+
+        best = None
+        seen = set()
+        for table, band in zip(tables, self._bands(signature)):
+            bucket = table.get(band)
+            if bucket is None:
+                continue
+            for entry_id in bucket if isinstance(bucket, list) else (bucket,):
+                if entry_id in seen:
+                    continue
+                seen.add(entry_id)
+                other, preview, ref = self._entries[entry_id]
+                similarity = float(np.count_nonzero(signature == np.frombuffer(other, np.uint32))) / NUM_HASHES
+                if similarity >= self.threshold and (best is None or similarity > best['similarity']):
+                    best = {'similarity': similarity, 'text': preview, 'ref': ref}
+        return best
+
+    def _discard(self, account: str, entry_id: int):
+        # Leaves the id in _order, skipped on eviction; compacting once most
+        # ids there are dead keeps removal amortized O(1)
+        self._drop(account, entry_id)
+        order = self._order[account]
+        if len(order) > 2 * self._sizes[account] + 64:
+            self._order[account] = deque(live for live in order if live in self._entries)
+
+    def _drop(self, account: str, entry_id: int):
+        signature, _, ref = self._entries.pop(entry_id)
+        self._sizes[account] -= 1
+        if ref is not None:
+            self._refs.pop((account, ref), None)
+        for table, band in zip(self._tables[account], self._bands(np.frombuffer(signature, np.uint32))):
+            bucket = table.get(band)
+            if isinstance(bucket, list):
+                bucket.remove(entry_id)
+                if len(bucket) == 1:
+                    table[band] = bucket[0]
+            elif bucket == entry_id:
+                del table[band]
+
+# Shared by the tweet handler and the scheduler
+near_duplicate_index = NearDuplicateIndex()
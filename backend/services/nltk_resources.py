@@ -0,0 +1,92 @@
+"""
+NLTK data used by the services, provisioned once into a local directory
+
+Services never download at runtime: run this module at image build time
+(from the backend directory) and ship the resulting directory:
+
+    python -m services.nltk_resources
+"""
+import os
+import sys
+from typing import Dict, Iterable, Optional
+
+# Download name -> path nltk.data.find() resolves
+NLTK_RESOURCES: Dict[str, str] = {
+    'vader_lexicon': 'sentiment/vader_lexicon.zip',
+    'punkt': 'tokenizers/punkt'
+}
+
+DEFAULT_RESOURCE_ROOT = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'nltk_data')
+
+def resource_dir() -> str:
+    """
+    Versioned directory holding the NLTK data
+
+    The directory is per NLTK release, since data formats change between
+    releases; upgrading NLTK requires provisioning again.
+
+    :return: Directory path, from NLTK_RESOURCE_DIR or backend/nltk_data
+    """
+    from importlib import metadata
+    try:
+        version = metadata.version('nltk')
+    except metadata.PackageNotFoundError:
+        version = 'unknown'
+    root = os.getenv('NLTK_RESOURCE_DIR', DEFAULT_RESOURCE_ROOT)
+    return os.path.join(root, f"nltk-{version}")
+
+def use_resource_dir():
+    """
+    Make NLTK look in the local resource directory first, without network access
+    """
+    import nltk
+    path = resource_dir()
+    if path not in nltk.data.path:
+        nltk.data.path.insert(0, path)
+
+def require(name: str):
+    """
+    Check an NLTK resource is provisioned
+
+    :param name: Download name, a key of NLTK_RESOURCES
+    :raises LookupError: If the resource has not been provisioned
+    """
+    import nltk
+    use_resource_dir()
+    try:
+        nltk.data.find(NLTK_RESOURCES[name])
+    except LookupError:
+        raise LookupError(
+            f"NLTK resource '{name}' is not provisioned in {resource_dir()}; "
+            f"run 'python -m services.nltk_resources' from the backend directory"
+        ) from None
+
+def provision(names: Optional[Iterable[str]] = None) -> bool:
+    """
+    Download missing NLTK resources into the local resource directory
+
+    :param names: Download names, defaults to all of NLTK_RESOURCES
+    :return: True if every resource is available afterwards
+    """
+    import nltk
+    path = resource_dir()
+    os.makedirs(path, exist_ok=True)
+    use_resource_dir()
+
+    available = True
+    for name in names or NLTK_RESOURCES:
+        try:
+            nltk.data.find(NLTK_RESOURCES[name], paths=[path])
+            print(f"✅ {name} already provisioned")
+            continue
+        except LookupError:
+            pass
+        if nltk.download(name, download_dir=path, quiet=True):
+            print(f"✅ Provisioned {name} into {path}")
+        else:
+            print(f"🚨 Could not provision {name}")
+            available = False
+    return available
+
+if __name__ == "__main__":
+    sys.exit(0 if provision(sys.argv[1:] or None) else 1)
@@ -0,0 +1,145 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+import torch
+
+try:
+    from transformers import DynamicCache
+except ImportError:
+    # Older transformers releases only understand legacy tuple caches
+    DynamicCache = None
+
+class PrefixKVCache:
+    def __init__(self, model, tokenizer, device, max_entries: Optional[int] = None):
+        """
+        LRU cache of past key/values for known prompt prefixes
+
+        :param model: Causal language model
+        :param tokenizer: Tokenizer matching the model
+        :param device: Device the model runs on
+        :param max_entries: Maximum number of cached prefixes
+        """
+        self.model = model
+        self.tokenizer = tokenizer
+        self.device = device
+        self.max_entries = (
+            max_entries if max_entries is not None
+            else int(os.getenv('PREFIX_CACHE_MAX_ENTRIES', '32'))
+        )
+
+        self.prefixes = set()
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Cache statistics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def register(self, *prefixes: str):
+        """
+        Mark prompt prefixes as worth caching
+
+        :param prefixes: Fixed prompt prefixes, e.g. a tone's lead-in
+        """
+        with self._lock:
+            self.prefixes.update(prefix for prefix in prefixes if prefix)
+
+    def match(self, prompt: str) -> Optional[str]:
+        """
+        Find the longest registered prefix of a prompt
+
+        :param prompt: Full prompt text
+        :return: Matching prefix or None
+        """
+        with self._lock:
+            candidates = [prefix for prefix in self.prefixes if prompt.startswith(prefix)]
+        return max(candidates, key=len) if candidates else None
+
+    def get(self, prefix: str) -> Optional[Tuple[torch.Tensor, List]]:
+        """
+        Get the token ids and cached key/values for a prefix, computing them once
+
+        The last prefix token is left out of the cache so decoding always has
+        at least one new token to process, even when the prompt is the prefix.
+
+        :param prefix: Registered prompt prefix
+        :return: (prefix token ids, per-layer key/value tensors) or None
+        """
+        with self._lock:
+            entry = self._entries.get(prefix)
+            if entry is not None:
+                self._entries.move_to_end(prefix)
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        entry = self._compute(prefix)
+        if entry is None:
+            return None
+
+        with self._lock:
+            self._entries[prefix] = entry
+            self._entries.move_to_end(prefix)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+        return entry
+
+    def build_cache(self, layers: List, batch_size: int):
+        """
+        Build a fresh past_key_values object for a batch from cached tensors
+
+        :param layers: Per-layer (key, value) tensors for a single sequence
+        :param batch_size: Number of rows the cache must cover
+        :return: Cache object accepted by model.generate
+        """
+        expanded = [
+            (key.repeat_interleave(batch_size, dim=0), value.repeat_interleave(batch_size, dim=0))
+            for key, value in layers
+        ]
+        if DynamicCache is None:
+            return tuple(expanded)
+
+        # generate() appends to the cache, so every call gets its own copy
+        cache = DynamicCache()
+        for layer_idx, (key, value) in enumerate(expanded):
+            cache.update(key, value, layer_idx)
+        return cache
+
+    def stats(self) -> Dict:
+        """
+        Report prefix cache usage
+
+        :return: Dictionary of cache statistics
+        """
+        with self._lock:
+            return {
+                'registered_prefixes': len(self.prefixes),
+                'cached_prefixes': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions
+            }
+
+    def _compute(self, prefix: str):
+        prefix_ids = self.tokenizer(prefix, return_tensors='pt').input_ids.to(self.device)
+        if prefix_ids.shape[1] < 2:
+            # Nothing left to cache once the last token is held back
+            return None
+
+        with torch.no_grad():
+            output = self.model(prefix_ids[:, :-1], use_cache=True)
+
+        return prefix_ids, self._layers(output.past_key_values)
+
+    @staticmethod
+    def _layers(past) -> List:
+        if hasattr(past, 'layers'):
+            return [(layer.keys, layer.values) for layer in past.layers]
+        if hasattr(past, 'key_cache'):
+            return list(zip(past.key_cache, past.value_cache))
+        return [(key, value) for key, value in past]
@@ -0,0 +1,127 @@
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+
+class ProviderHealth:
+    def __init__(self, name: str, failure_threshold: int = 5, cooldown_seconds: float = 30.0,
+                 window: int = 200):
+        """
+        Circuit breaker plus latency and error statistics for one provider
+
+        The circuit opens after failure_threshold consecutive failures and the
+        provider is skipped until cooldown_seconds have passed. A single trial
+        call is then let through (half-open); success closes the circuit and
+        failure opens it for another cool-down. allow() hands out a ticket per
+        call, so only the trial call itself can settle or give back the trial.
+
+        :param name: Provider name used in stats
+        :param failure_threshold: Consecutive failures that open the circuit
+        :param cooldown_seconds: How long an open circuit skips the provider
+        :param window: Number of recent latencies kept for percentiles
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self._latencies = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self._consecutive_failures = 0
+        self._opened_at: Optional[float] = None
+        # Ticket of the half-open trial call, if one is running
+        self._trial: Optional[int] = None
+        self._next_ticket = 0
+        self.calls = 0
+        self.successes = 0
+        self.failures = 0
+        self.skipped = 0
+        self.times_opened = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+
+    def _state(self) -> str:
+        if self._opened_at is None:
+            return 'closed'
+        if time.monotonic() - self._opened_at >= self.cooldown_seconds:
+            return 'half_open'
+        return 'open'
+
+    def allow(self) -> Optional[int]:
+        """
+        Check whether a call may go to the provider, counting skipped calls
+
+        :return: A ticket to pass to record_failure or release,
+                 or None while the circuit is open
+        """
+        with self._lock:
+            state = self._state()
+            if state == 'half_open' and self._trial is not None:
+                state = 'open'
+            if state == 'open':
+                self.skipped += 1
+                return None
+            self._next_ticket += 1
+            if state == 'half_open':
+                self._trial = self._next_ticket
+            return self._next_ticket
+
+    def record_success(self, latency: float):
+        with self._lock:
+            self.calls += 1
+            self.successes += 1
+            self._latencies.append(latency)
+            self._consecutive_failures = 0
+            self._opened_at = None
+            self._trial = None
+
+    def record_failure(self, latency: float, ticket: Optional[int] = None):
+        with self._lock:
+            self.calls += 1
+            self.failures += 1
+            self._latencies.append(latency)
+            self._consecutive_failures += 1
+            reopen = ticket is not None and ticket == self._trial
+            trip = self._opened_at is None and self._consecutive_failures >= self.failure_threshold
+            if reopen or trip:
+                self.times_opened += 1
+                self._opened_at = time.monotonic()
+            if reopen:
+                self._trial = None
+
+    def release(self, ticket: Optional[int]):
+        """
+        Give back a half-open trial that was abandoned without an outcome
+
+        :param ticket: Ticket from allow(); other calls' tickets leave the trial running
+        """
+        with self._lock:
+            if ticket is not None and ticket == self._trial:
+                self._trial = None
+
+    def stats(self) -> Dict:
+        """
+        Report circuit state and latency percentiles
+
+        :return: Dictionary of provider statistics
+        """
+        with self._lock:
+            latencies = sorted(self._latencies)
+            stats = {
+                'state': self._state(),
+                'calls': self.calls,
+                'successes': self.successes,
+                'failures': self.failures,
+                'error_rate': self.failures / self.calls if self.calls else 0,
+                'skipped': self.skipped,
+                'times_opened': self.times_opened,
+                'consecutive_failures': self._consecutive_failures
+            }
+        if latencies:
+            stats.update({
+                'latency_p50_ms': latencies[len(latencies) // 2] * 1000,
+                'latency_p95_ms': latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000,
+                'latency_max_ms': latencies[-1] * 1000
+            })
+        return stats
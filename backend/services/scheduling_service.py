@@ -1,35 +1,59 @@
+import functools
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 import pytz
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.date import DateTrigger
 from apscheduler.triggers.interval import IntervalTrigger
+from .near_duplicate import NearDuplicateIndex
 
 class SchedulingService:
-    def __init__(self):
+    def __init__(self, duplicate_index: Optional[NearDuplicateIndex] = None):
+        """
+        :param duplicate_index: Optional guard refusing drafts similar to posted or scheduled ones
+        """
         # Initialize async scheduler
         self.scheduler = AsyncIOScheduler()
         self.scheduled_jobs: Dict[str, Dict] = {}
+        self.duplicate_index = duplicate_index
     
     def schedule_tweet(self, 
                        tweet_func, 
                        tweet_args: List, 
                        schedule_time: Optional[datetime] = None,
                        interval: Optional[int] = None,
-                       job_id: Optional[str] = None):
+                       job_id: Optional[str] = None,
+                       account: Optional[str] = None,
+                       content: Optional[str] = None):
         """
         Schedule a tweet to be posted
         
-        :param tweet_func: Function to post tweet
+        :param tweet_func: Function to post tweet; with the near-duplicate guard it
+                           must accept duplicate_ref, like TweetHandler.post_tweet
         :param tweet_args: Arguments for tweet function
         :param schedule_time: Specific time to post
         :param interval: Interval in minutes to repeat
         :param job_id: Unique identifier for the job
-        :return: Job ID
+        :param account: Posting account, checked by the near-duplicate guard
+        :param content: Tweet text, checked by the near-duplicate guard
+        :return: Job ID, or None if scheduling failed or the content is a near-duplicate
         """
         if not job_id:
             job_id = f"tweet_{datetime.now().timestamp()}"
         
+        guarded = bool(self.duplicate_index and account and content)
+        if guarded:
+            match = self.duplicate_index.find(account, content)
+            if match:
+                print(f"Refusing to schedule near-duplicate tweet for {account} "
+                      f"({match['similarity']:.0%} similar to: {match['text']})")
+                return None
+            
+            # The posting guard sees the job's own content once it runs, so
+            # the scheduled entry is released just before posting and the post
+            # is recorded under the job id, where the next repeat releases it
+            tweet_func = self._releasing_job(tweet_func, account, job_id)
+        
         try:
             if schedule_time:
                 # Schedule at a specific time
@@ -57,9 +81,13 @@ class SchedulingService:
                 'func': tweet_func,
                 'args': tweet_args,
                 'schedule_time': schedule_time,
-                'interval': interval
+                'interval': interval,
+                'account': account
             }
             
+            if guarded:
+                self.duplicate_index.add(account, content, ref=job_id)
+            
             return job_id
         except Exception as e:
             print(f"Scheduling error: {e}")
@@ -74,12 +102,21 @@ class SchedulingService:
         """
         try:
             self.scheduler.remove_job(job_id)
-            del self.scheduled_jobs[job_id]
+            job = self.scheduled_jobs.pop(job_id)
+            if self.duplicate_index and job.get('account'):
+                self.duplicate_index.remove(job['account'], job_id)
             return True
         except Exception as e:
             print(f"Error canceling job: {e}")
             return False
     
+    def _releasing_job(self, tweet_func, account: str, job_id: str):
+        @functools.wraps(tweet_func)
+        def run(*args, **kwargs):
+            self.duplicate_index.remove(account, job_id)
+            return tweet_func(*args, duplicate_ref=job_id, **kwargs)
+        return run
+    
     def list_scheduled_tweets(self):
         """
         List all scheduled tweets
@@ -0,0 +1,46 @@
+import torch
+from transformers import (
+    LogitsProcessor,
+    LogitsProcessorList,
+    TemperatureLogitsWarper,
+    TopKLogitsWarper,
+    TopPLogitsWarper
+)
+
+class GumbelNoiseLogitsProcessor(LogitsProcessor):
+    def __init__(self, seed: int):
+        """
+        Turn greedy decoding into sampling driven by a private, seeded RNG
+
+        Taking the argmax of logits plus Gumbel noise draws exactly from the
+        softmax distribution, without touching torch's global RNG that other
+        threads sample from concurrently.
+
+        :param seed: Seed for this generation
+        """
+        self.generator = torch.Generator().manual_seed(seed)
+
+    def __call__(self, input_ids: torch.LongTensor, scores: torch.FloatTensor) -> torch.FloatTensor:
+        uniform = torch.rand(scores.shape, generator=self.generator).to(scores.device)
+        exponential = -torch.log(uniform.clamp_min(1e-20))
+        gumbel = -torch.log(exponential.clamp_min(1e-20))
+        return scores + gumbel
+
+def seeded_sampling_processors(seed: int, temperature: float, top_k: int, top_p: float) -> LogitsProcessorList:
+    """
+    Logits processors reproducing temperature/top-k/top-p sampling from a seed
+
+    Use with do_sample=False so generate() takes the argmax of the noisy scores.
+
+    :param seed: Seed for this generation
+    :param temperature: Sampling temperature
+    :param top_k: Number of highest-probability tokens kept
+    :param top_p: Cumulative probability kept
+    :return: LogitsProcessorList to pass to generate()
+    """
+    return LogitsProcessorList([
+        TemperatureLogitsWarper(temperature),
+        TopKLogitsWarper(top_k),
+        TopPLogitsWarper(top_p),
+        GumbelNoiseLogitsProcessor(seed)
+    ])
@@ -0,0 +1,98 @@
+import multiprocessing
+import os
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional
+
+# Each worker process builds its analyzers once, in _init_worker
+_worker_service = None
+
+def _init_worker():
+    global _worker_service
+    from .sentiment_service import SentimentService
+    _worker_service = SentimentService()
+    # Load the lexicon now rather than inside the first chunk
+    _worker_service.vader_analyzer
+
+def _init_worker_once():
+    if _worker_service is None:
+        _init_worker()
+
+def _analyze_chunk(texts: List[str], mode: str = 'both') -> List[Dict[str, float]]:
+    return [_worker_service.analyze_sentiment(text, mode) for text in texts]
+
+class BatchSentimentEngine:
+    def __init__(self, max_workers: Optional[int] = None, chunk_size: Optional[int] = None):
+        """
+        Score large batches of texts across a process pool
+
+        :param max_workers: Worker processes; 1 scores in the calling process
+        :param chunk_size: Texts sent to a worker at a time
+        """
+        self.max_workers = max_workers or int(os.getenv('SENTIMENT_WORKERS', '0')) or os.cpu_count() or 1
+        self.chunk_size = chunk_size or int(os.getenv('SENTIMENT_CHUNK_SIZE', '500'))
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def analyze(self, texts: Iterable[str], mode: str = 'both') -> Iterator[Dict[str, float]]:
+        """
+        Score texts, yielding results in input order
+
+        At most two chunks per worker are in flight, so arbitrarily long
+        inputs (including generators) use bounded memory.
+
+        :param texts: Texts to analyze
+        :param mode: Analyzers to run: 'vader', 'textblob' or 'both'
+        :return: Generator of sentiment results, one per text
+        """
+        chunks = self._chunks(texts)
+
+        if self.max_workers == 1:
+            _init_worker_once()
+            for chunk in chunks:
+                yield from _analyze_chunk(chunk, mode)
+            return
+
+        executor = self._get_executor()
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(_analyze_chunk, chunk, mode))
+            if len(pending) >= self.max_workers * 2:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+    def shutdown(self):
+        """
+        Stop the worker processes
+        """
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+    def _chunks(self, texts: Iterable[str]) -> Iterator[List[str]]:
+        iterator = iter(texts)
+        while True:
+            chunk = list(islice(iterator, self.chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # Spawned workers do not inherit the server's model threads
+                context = multiprocessing.get_context(os.getenv('SENTIMENT_START_METHOD', 'spawn'))
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=context,
+                    initializer=_init_worker
+                )
+            return self._executor
+
+# Shared by SentimentService.batch_sentiment_analysis
+batch_sentiment_engine = BatchSentimentEngine()
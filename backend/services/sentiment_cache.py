@@ -0,0 +1,149 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from importlib import metadata
+from typing import Callable, Dict, Optional
+
+def _package_version(name: str) -> str:
+    try:
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:
+        return 'unknown'
+
+# Part of every cache key, so upgrading an analyzer invalidates its scores
+ANALYZER_VERSIONS = {
+    'textblob': f"textblob-{_package_version('textblob')}",
+    'vader': f"vader-nltk-{_package_version('nltk')}"
+}
+
+class SentimentCache:
+    def __init__(self, max_entries: Optional[int] = None, path: Optional[str] = None):
+        """
+        Sentiment scores keyed by a hash of the analyzer version and the normalized text
+
+        :param max_entries: Scores kept in memory, least recently used first out
+        :param path: SQLite file persisting scores across restarts, None to keep them in memory only
+        """
+        self.max_entries = max_entries or int(os.getenv('SENTIMENT_CACHE_SIZE', '50000'))
+        self.path = path if path is not None else os.getenv('SENTIMENT_CACHE_PATH')
+
+        self._scores: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if self.path:
+            try:
+                self._db = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+                self._db.execute(
+                    'CREATE TABLE IF NOT EXISTS scores (key TEXT PRIMARY KEY, scores TEXT NOT NULL)'
+                )
+                self._db.commit()
+            except sqlite3.Error as e:
+                print(f"🚨 Sentiment cache persistence disabled: {e}")
+                self._db = None
+
+    def get_or_compute(self, analyzer: str, text: str,
+                       compute: Callable[[str], Dict[str, float]]) -> Dict[str, float]:
+        """
+        Get an analyzer's scores for a text, computing them on a miss
+
+        :param analyzer: Analyzer name, a key of ANALYZER_VERSIONS
+        :param text: Text to score
+        :param compute: Scores the text when it is not cached
+        :return: A copy of the cached scores
+        """
+        key = self._key(analyzer, text)
+        with self._lock:
+            scores = self._scores.get(key)
+            if scores is not None:
+                self._scores.move_to_end(key)
+                self.hits += 1
+                return dict(scores)
+
+        scores = self._load(key)
+        if scores is None:
+            scores = compute(text)
+            self._save(key, scores)
+            with self._lock:
+                self.misses += 1
+        else:
+            with self._lock:
+                self.disk_hits += 1
+
+        with self._lock:
+            self._scores[key] = scores
+            while len(self._scores) > self.max_entries:
+                self._scores.popitem(last=False)
+        return dict(scores)
+
+    def stats(self) -> Dict:
+        """
+        Report cache usage
+
+        :return: Dictionary of cache statistics
+        """
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                'entries': len(self._scores),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': (self.hits + self.disk_hits) / lookups if lookups else 0,
+                'path': self.path if self._db is not None else None
+            }
+
+    @staticmethod
+    def _key(analyzer: str, text: str) -> str:
+        # Whitespace does not change the analyzers' tokens; case does (VADER)
+        normalized = ' '.join(text.split())
+        raw = f"{ANALYZER_VERSIONS[analyzer]}\0{normalized}"
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def _load(self, key: str) -> Optional[Dict[str, float]]:
+        if self._db is None:
+            return None
+        try:
+            with self._lock:
+                row = self._db.execute('SELECT scores FROM scores WHERE key = ?', (key,)).fetchone()
+        except sqlite3.Error:
+            return None
+        return json.loads(row[0]) if row else None
+
+    def _save(self, key: str, scores: Dict[str, float]):
+        if self._db is None:
+            return
+        try:
+            with self._lock:
+                self._db.execute(
+                    'INSERT OR REPLACE INTO scores (key, scores) VALUES (?, ?)',
+                    (key, json.dumps(scores))
+                )
+                self._db.commit()
+        except sqlite3.Error as e:
+            print(f"🚨 Could not persist sentiment scores: {e}")
+
+def _score_textblob(text: str) -> Dict[str, float]:
+    # Imported on first use; textblob pulls in all of NLTK
+    from textblob import TextBlob
+    sentiment = TextBlob(text).sentiment
+    return {'polarity': sentiment.polarity, 'subjectivity': sentiment.subjectivity}
+
+def textblob_sentiment(text: str) -> Dict[str, float]:
+    """
+    Cached TextBlob polarity and subjectivity of a text
+
+    :param text: Text to score
+    :return: Dictionary with 'polarity' and 'subjectivity'
+    """
+    return sentiment_cache.get_or_compute('textblob', text, _score_textblob)
+
+# Shared by SentimentService, AIContentGenerator and ContentGenerator
+sentiment_cache = SentimentCache()
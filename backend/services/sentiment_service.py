@@ -1,38 +1,82 @@
-from textblob import TextBlob
-from typing import Dict, List, Optional
-import nltk
-from nltk.sentiment import SentimentIntensityAnalyzer
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Literal, Optional
+from .nltk_resources import require
+from .sentiment_batch import batch_sentiment_engine
+from .sentiment_cache import sentiment_cache, textblob_sentiment
+from .tweet_postprocessing import truncate_weighted
+
+# Which analyzers a call runs
+SentimentMode = Literal['vader', 'textblob', 'both']
 
 class SentimentService:
     def __init__(self):
-        # Download necessary NLTK data
-        nltk.download('vader_lexicon', quiet=True)
-        
-        # Initialize sentiment analyzers
-        self.textblob_analyzer = TextBlob
-        self.vader_analyzer = SentimentIntensityAnalyzer()
+        # Analyzers are built on first use, so constructing the service is free
+        self._vader_analyzer = None
+        self._lexicon_words: Optional[FrozenSet[str]] = None
+    
+    @property
+    def textblob_analyzer(self):
+        from textblob import TextBlob
+        return TextBlob
     
-    def analyze_sentiment(self, text: str) -> Dict[str, float]:
+    @property
+    def vader_analyzer(self):
+        if self._vader_analyzer is None:
+            # Uses the provisioned lexicon, never downloads
+            require('vader_lexicon')
+            from nltk.sentiment import SentimentIntensityAnalyzer
+            analyzer = SentimentIntensityAnalyzer()
+            # Compact lookup set for the no-sentiment-word fast path
+            self._lexicon_words = frozenset(analyzer.lexicon)
+            self._vader_analyzer = analyzer
+        return self._vader_analyzer
+    
+    def analyze_sentiment(self, text: str, mode: SentimentMode = 'both') -> Dict[str, float]:
         """
         Analyze sentiment using multiple methods
         
         :param text: Text to analyze
-        :return: Sentiment scores
+        :param mode: Analyzers to run: 'vader', 'textblob' or 'both'
+        :return: Sentiment scores of the selected analyzers
         """
-        # TextBlob sentiment analysis
-        blob_sentiment = self.textblob_analyzer(text)
-        
-        # VADER sentiment analysis
-        vader_sentiment = self.vader_analyzer.polarity_scores(text)
-        
-        return {
-            'textblob_polarity': blob_sentiment.sentiment.polarity,
-            'textblob_subjectivity': blob_sentiment.sentiment.subjectivity,
-            'vader_positive': vader_sentiment['pos'],
-            'vader_negative': vader_sentiment['neg'],
-            'vader_neutral': vader_sentiment['neu'],
-            'vader_compound': vader_sentiment['compound']
-        }
+        if mode not in ('vader', 'textblob', 'both'):
+            raise ValueError(f"Unknown sentiment mode: {mode}")
+        
+        scores = {}
+        if mode != 'vader':
+            # TextBlob sentiment analysis, shared with the content generators
+            blob_sentiment = textblob_sentiment(text)
+            scores['textblob_polarity'] = blob_sentiment['polarity']
+            scores['textblob_subjectivity'] = blob_sentiment['subjectivity']
+        
+        if mode != 'textblob':
+            # VADER sentiment analysis
+            vader_sentiment = self._vader_scores(text)
+            scores['vader_positive'] = vader_sentiment['pos']
+            scores['vader_negative'] = vader_sentiment['neg']
+            scores['vader_neutral'] = vader_sentiment['neu']
+            scores['vader_compound'] = vader_sentiment['compound']
+        
+        return scores
+    
+    def _vader_scores(self, text: str) -> Dict[str, float]:
+        """
+        VADER scores, skipping the full analyzer for texts without lexicon words
+        
+        Only lexicon words carry valence in VADER; boosters, negations and
+        punctuation merely scale it. A text with no lexicon word therefore
+        always scores exactly neutral, which a set lookup per token detects.
+        """
+        analyzer = self.vader_analyzer
+        strip_punctuation = analyzer.constants.REGEX_REMOVE_PUNCTUATION
+        
+        tokens = [token for token in text.split() if len(token) > 1]
+        for token in tokens:
+            lowered = token.lower()
+            # VADER also matches a token with its leading or trailing punctuation removed
+            if lowered in self._lexicon_words or strip_punctuation.sub('', lowered) in self._lexicon_words:
+                return sentiment_cache.get_or_compute('vader', text, analyzer.polarity_scores)
+        
+        return {'neg': 0.0, 'neu': 1.0 if tokens else 0.0, 'pos': 0.0, 'compound': 0.0}
     
     def classify_sentiment(self, text: str) -> str:
         """
@@ -41,7 +85,7 @@ class SentimentService:
         :param text: Text to classify
         :return: Sentiment classification
         """
-        sentiment_scores = self.analyze_sentiment(text)
+        sentiment_scores = self.analyze_sentiment(text, mode='vader')
         
         # Use VADER compound score for classification
         compound_score = sentiment_scores['vader_compound']
@@ -53,14 +97,31 @@ class SentimentService:
         else:
             return 'neutral'
     
-    def batch_sentiment_analysis(self, texts: List[str]) -> List[Dict[str, float]]:
+    def batch_sentiment_analysis(self, texts: List[str],
+                                 mode: SentimentMode = 'both') -> List[Dict[str, float]]:
         """
         Perform sentiment analysis on multiple texts
         
+        Batches larger than one chunk are spread over the worker processes.
+        
         :param texts: List of texts to analyze
+        :param mode: Analyzers to run: 'vader', 'textblob' or 'both'
         :return: List of sentiment analysis results
         """
-        return [self.analyze_sentiment(text) for text in texts]
+        if len(texts) <= batch_sentiment_engine.chunk_size:
+            return [self.analyze_sentiment(text, mode) for text in texts]
+        return list(batch_sentiment_engine.analyze(texts, mode))
+    
+    def iter_sentiment_analysis(self, texts: Iterable[str],
+                                mode: SentimentMode = 'both') -> Iterator[Dict[str, float]]:
+        """
+        Stream sentiment analysis of many texts in input order
+        
+        :param texts: Texts to analyze, e.g. a generator over collected tweets
+        :param mode: Analyzers to run: 'vader', 'textblob' or 'both'
+        :return: Generator of sentiment analysis results
+        """
+        return batch_sentiment_engine.analyze(texts, mode)
     
     def generate_reply_based_on_sentiment(self, 
                                           original_text: str, 
@@ -99,4 +160,4 @@ class SentimentService:
         import random
         template = random.choice(reply_templates.get(sentiment_type, reply_templates['neutral']))
         
-        return template.format(original=original_text)[:280]  # Ensure tweet length
+        return truncate_weighted(template.format(original=original_text), 280)  # Ensure tweet length
@@ -0,0 +1,51 @@
+import torch
+from transformers import StoppingCriteria
+from .twitter_text import weighted_length
+
+SENTENCE_ENDINGS = ('.', '!', '?')
+
+class CharacterBudgetStoppingCriteria(StoppingCriteria):
+    def __init__(self, tokenizer, max_length: int = 280, sentence_ratio: float = 0.8):
+        """
+        Stop each sequence once its decoded text fills the tweet budget
+
+        :param tokenizer: Tokenizer used to decode the sequences
+        :param max_length: Weighted character budget of the final tweet
+        :param sentence_ratio: Fraction of the budget after which a sentence
+                               boundary is a good enough place to stop
+        """
+        self.tokenizer = tokenizer
+        self.max_length = max_length
+        self.sentence_length = int(max_length * sentence_ratio)
+        self._done = None
+
+    def __call__(self, input_ids: torch.LongTensor, scores: torch.FloatTensor, **kwargs) -> torch.BoolTensor:
+        if self._done is None or self._done.shape[0] != input_ids.shape[0]:
+            self._done = torch.zeros(input_ids.shape[0], dtype=torch.bool, device=input_ids.device)
+
+        # Only rows still decoding need their text measured
+        active = (~self._done).nonzero(as_tuple=True)[0].tolist()
+        texts = self.tokenizer.batch_decode(input_ids[active], skip_special_tokens=True)
+        for row, text in zip(active, texts):
+            # Measure the text the way the cleanup step will see it
+            text = ' '.join(text.split())
+            length = weighted_length(text)
+            if length >= self.max_length or (
+                length >= self.sentence_length and text.endswith(SENTENCE_ENDINGS)
+            ):
+                self._done[row] = True
+
+        return self._done.clone()
+
+class CancellationStoppingCriteria(StoppingCriteria):
+    def __init__(self, cancel_event):
+        """
+        Stop every sequence once the caller no longer wants the result
+
+        :param cancel_event: threading.Event set when the generation is cancelled
+        """
+        self.cancel_event = cancel_event
+
+    def __call__(self, input_ids: torch.LongTensor, scores: torch.FloatTensor, **kwargs) -> torch.BoolTensor:
+        cancelled = self.cancel_event.is_set()
+        return torch.full((input_ids.shape[0],), cancelled, dtype=torch.bool, device=input_ids.device)
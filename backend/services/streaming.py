@@ -0,0 +1,50 @@
+import asyncio
+from transformers import TextStreamer
+
+class AsyncTokenStreamer(TextStreamer):
+    # Marks the end of the stream in the queue
+    _END = object()
+
+    def __init__(self, tokenizer, loop: asyncio.AbstractEventLoop, skip_prompt: bool = True):
+        """
+        Hand text decoded in a worker thread to an async consumer
+
+        :param tokenizer: Tokenizer used to decode streamed tokens
+        :param loop: Event loop the consumer runs on
+        :param skip_prompt: Do not stream the prompt tokens back
+        """
+        super().__init__(tokenizer, skip_prompt=skip_prompt, skip_special_tokens=True)
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue()
+
+    def on_finalized_text(self, text: str, stream_end: bool = False):
+        # Called from the generation thread
+        if text:
+            self.loop.call_soon_threadsafe(self.queue.put_nowait, text)
+
+    def close(self):
+        """
+        Signal the consumer that no more text will arrive
+        """
+        self.loop.call_soon_threadsafe(self.queue.put_nowait, self._END)
+
+    def produce(self, func, *args, **kwargs):
+        """
+        Run a generation call that feeds this streamer, closing it afterwards
+
+        :param func: Blocking generation callable, e.g. generator.stream_tweet
+        :return: The callable's return value
+        """
+        try:
+            return func(self, *args, **kwargs)
+        finally:
+            self.close()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> str:
+        text = await self.queue.get()
+        if text is self._END:
+            raise StopAsyncIteration
+        return text
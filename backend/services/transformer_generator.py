@@ -1,119 +1,350 @@
+import os
+import time
 import torch
-from transformers import AutoModelForCausalLM, AutoTokenizer
+from transformers import AutoTokenizer
 import random
-import re
+from transformers import StoppingCriteriaList
+from .inference_backends import load_causal_lm
+from .prefix_cache import PrefixKVCache
+from .stopping_criteria import CharacterBudgetStoppingCriteria, CancellationStoppingCriteria
+from .seeded_sampling import seeded_sampling_processors
+from .tweet_postprocessing import clean_tweets, clean_tweet
+from .generation_metrics import generation_metrics, pop_queue_wait
 
 class TransformerTweetGenerator:
-    def __init__(self, model_name="distilgpt2"):
+    # Default prompts if no specific prompt provided
+    default_prompts = [
+        "The future of technology is",
+        "Innovative ideas that are changing the world",
+        "Breaking news in artificial intelligence:",
+        "A revolutionary concept in tech:"
+    ]
+
+    # Fixed lead-in shared by every thread prompt
+    thread_prompt_prefix = "Continuing the discussion about"
+
+    # Sampling settings for more controlled randomness
+    temperature = 0.7
+    top_k = 50
+    top_p = 0.95
+
+    def __init__(self, model_name="distilgpt2", backend=None):
         """
         Initialize Hugging Face Transformer model for tweet generation
         
         Args:
             model_name (str): Hugging Face model to use
+            backend (str): 'torch' (fp32), 'int8' or 'onnx'; defaults to TRANSFORMER_BACKEND
         """
+        self.model_name = model_name
+        self.backend = backend or os.getenv('TRANSFORMER_BACKEND', 'torch')
+        
         try:
             # Use CPU to avoid CUDA/GPU complications
             self.device = torch.device('cpu')
             
             # Load tokenizer and model
             self.tokenizer = AutoTokenizer.from_pretrained(model_name)
-            self.model = AutoModelForCausalLM.from_pretrained(model_name).to(self.device)
+            self.model = load_causal_lm(model_name, self.backend, self.device)
             
             # Configure tokenizer
             if self.tokenizer.pad_token is None:
                 self.tokenizer.pad_token = self.tokenizer.eos_token
             
+            # Decoder-only models continue from the right, so pad batches on the left
+            self.tokenizer.padding_side = 'left'
+            
             # Set model to evaluation mode
-            self.model.eval()
+            if hasattr(self.model, 'eval'):
+                self.model.eval()
+            
+            # Reuse key/values of the fixed prompt prefixes across requests;
+            # ONNX Runtime graphs manage their own cache format
+            if self.backend == 'onnx':
+                self.prefix_cache = None
+            else:
+                self.prefix_cache = PrefixKVCache(self.model, self.tokenizer, self.device)
+                self.prefix_cache.register(*self.default_prompts, self.thread_prompt_prefix)
         
         except Exception as e:
             print(f"🚨 Model Loading Error: {e}")
             self.tokenizer = None
             self.model = None
+            self.prefix_cache = None
 
-    def _clean_tweet(self, text, max_length=280):
+    def generate_tweet(self, prompt=None, max_length=280, seed=None):
         """
-        Clean and format generated text into a tweet
-        """
-        # Remove multiple whitespaces and strip
-        text = re.sub(r'\s+', ' ', text).strip()
-        
-        # Remove URLs and special tokens
-        text = re.sub(r'http\S+', '', text)
-        text = re.sub(r'<.*?>', '', text)
-        
-        # Truncate to max length
-        text = text[:max_length]
-        
-        # Add hashtag if no hashtag exists
-        if not re.search(r'#\w+', text):
-            hashtags = ['#Innovation', '#Technology', '#AI', '#Future']
-            text += f" {random.choice(hashtags)}"
+        Generate an AI-powered tweet
         
-        return text.strip()
+        Args:
+            prompt (str): Optional prompt; None picks a default prompt
+            max_length (int): Maximum tweet length in characters
+            seed (int): Optional seed for a reproducible tweet
+        """
+        return self.generate_batch([prompt], max_length, seed=seed)[0]
 
-    def generate_tweet(self, prompt=None, max_length=280):
+    def generate_batch(self, prompts, max_length=280, num_return_sequences=3, seed=None,
+                       raise_errors=False):
         """
-        Generate an AI-powered tweet
+        Generate one tweet per prompt with a single padded model call
+        
+        Args:
+            prompts (List[Optional[str]]): Prompts to complete; None picks a default prompt
+            max_length (int): Maximum tweet length in characters
+            num_return_sequences (int): Candidates sampled per prompt
+            seed (int): Optional seed; the same prompts and seed give the same tweets
+            raise_errors (bool): Raise on failure instead of returning placeholder messages
+        
+        Returns:
+            List[str]: The most interesting tweet for each prompt, in order
         """
         if not self.model or not self.tokenizer:
-            return "🤖 AI tweet generation currently unavailable."
+            if raise_errors:
+                raise RuntimeError("Model is not loaded")
+            return ["🤖 AI tweet generation currently unavailable."] * len(prompts)
 
-        # Default prompts if no specific prompt provided
-        default_prompts = [
-            "The future of technology is",
-            "Innovative ideas that are changing the world",
-            "Breaking news in artificial intelligence:",
-            "A revolutionary concept in tech:"
-        ]
+        rng = random.Random(seed) if seed is not None else random
+        queue_wait = pop_queue_wait()
+        usage = {}
         
-        # Select or use provided prompt
-        current_prompt = prompt or random.choice(default_prompts)
+        # Select or use provided prompts
+        current_prompts = [prompt or rng.choice(self.default_prompts) for prompt in prompts]
         
+        start = time.perf_counter()
         try:
-            # Encode the prompt
-            input_ids = self.tokenizer.encode(current_prompt, return_tensors='pt').to(self.device)
+            output = self.generate_sequences(
+                current_prompts, max_length, num_return_sequences, seed=seed, usage=usage
+            )
+            generated = time.perf_counter()
             
-            # Generate text with more controlled randomness
-            with torch.no_grad():
-                output = self.model.generate(
-                    input_ids, 
-                    max_length=max_length * 2,  
-                    num_return_sequences=3,     
-                    no_repeat_ngram_size=2,
-                    temperature=0.7,            
-                    top_k=50,                   
-                    top_p=0.95,
-                    do_sample=True
-                )
+            # Decode and clean every candidate in one pass
+            decoded = self.tokenizer.batch_decode(output, skip_special_tokens=True)
+            candidates = clean_tweets(decoded, max_length, rng=rng)
             
-            # Decode and clean generated tweets
+            # Keep the most interesting tweet for each prompt
             tweets = [
-                self._clean_tweet(
-                    self.tokenizer.decode(seq, skip_special_tokens=True), 
-                    max_length
-                ) for seq in output
+                max(candidates[index:index + num_return_sequences], key=len)
+                for index in range(0, len(candidates), num_return_sequences)
             ]
             
-            # Return the most interesting tweet
-            return max(tweets, key=len)
+            self._record_metrics('batch', len(prompts), queue_wait, generated - start,
+                                 time.perf_counter() - generated, usage)
+            return tweets
         
         except Exception as e:
             print(f"🚨 Tweet Generation Error: {e}")
+            self._record_metrics('batch', len(prompts), queue_wait, time.perf_counter() - start,
+                                 0.0, usage, error=str(e))
+            if raise_errors:
+                raise
+            return ["🤖 Unable to generate tweet at the moment."] * len(prompts)
+
+    def stream_tweet(self, streamer, prompt=None, max_length=280, cancel_event=None):
+        """
+        Generate a single tweet while pushing decoded text to a streamer
+        
+        Args:
+            streamer: transformers streamer receiving tokens as they are decoded
+            prompt (str): Optional prompt; None picks a default prompt
+            max_length (int): Maximum tweet length in characters
+            cancel_event (threading.Event): Set to stop decoding early
+        
+        Returns:
+            str: The final cleaned tweet
+        """
+        if not self.model or not self.tokenizer:
+            return "🤖 AI tweet generation currently unavailable."
+
+        current_prompt = prompt or random.choice(self.default_prompts)
+        queue_wait = pop_queue_wait()
+        usage = {}
+        
+        start = time.perf_counter()
+        try:
+            # Streamers only support a single sequence
+            output = self.generate_sequences(
+                [current_prompt],
+                max_length,
+                num_return_sequences=1,
+                streamer=streamer,
+                cancel_event=cancel_event,
+                usage=usage
+            )
+            generated = time.perf_counter()
+            tweet = clean_tweet(
+                self.tokenizer.decode(output[0], skip_special_tokens=True),
+                max_length
+            )
+            self._record_metrics('stream', 1, queue_wait, generated - start,
+                                 time.perf_counter() - generated, usage)
+            return tweet
+        
+        except Exception as e:
+            print(f"🚨 Tweet Streaming Error: {e}")
+            self._record_metrics('stream', 1, queue_wait, time.perf_counter() - start,
+                                 0.0, usage, error=str(e))
             return "🤖 Unable to generate tweet at the moment."
 
-    def generate_thread(self, topic=None, length=3, max_tweet_length=280):
+    def _record_metrics(self, operation, items, queue_wait, latency, postprocess, usage, error=None):
+        generation_metrics.record(
+            'transformer',
+            operation,
+            latency,
+            model=f"{self.model_name}:{self.backend}",
+            queue_wait=queue_wait,
+            postprocess=postprocess,
+            prompt_tokens=usage.get('prompt_tokens', 0),
+            completion_tokens=usage.get('completion_tokens', 0),
+            items=items,
+            error=error
+        )
+
+    def generate_sequences(self, prompts, max_length=280, num_return_sequences=3, budget_stopping=True,
+                           streamer=None, cancel_event=None, seed=None, usage=None):
+        """
+        Sample raw token sequences for a batch of prompts
+        
+        Args:
+            prompts (List[str]): Prompts to complete
+            max_length (int): Weighted character budget of each tweet
+            num_return_sequences (int): Candidates sampled per prompt
+            budget_stopping (bool): Stop each sequence once its text fills the budget
+            streamer: Optional transformers streamer for single-sequence generation
+            cancel_event (threading.Event): Optional event that stops decoding when set
+            seed (int): Optional seed for reproducible sampling
+            usage (dict): Optional dict filled with prompt_tokens and completion_tokens
+        
+        Returns:
+            torch.Tensor: Prompt plus generated token ids, num_return_sequences rows per prompt
+        """
+        inputs, expanded = self._encode_prompts(prompts, num_return_sequences)
+        
+        stopping_criteria = StoppingCriteriaList()
+        if budget_stopping:
+            # A token decodes to at least one character, so the character budget
+            # bounds the tokens needed; the stopping criterion ends most sequences sooner
+            length_kwargs = {'max_new_tokens': max_length}
+            stopping_criteria.append(CharacterBudgetStoppingCriteria(self.tokenizer, max_length))
+        else:
+            length_kwargs = {'max_length': max_length * 2}
+        
+        if cancel_event is not None:
+            stopping_criteria.append(CancellationStoppingCriteria(cancel_event))
+        
+        if seed is None:
+            sampling_kwargs = {
+                'temperature': self.temperature,
+                'top_k': self.top_k,
+                'top_p': self.top_p,
+                'do_sample': True
+            }
+        else:
+            # Same distribution, but drawn from a private seeded RNG instead of
+            # torch's global one that concurrent generations share
+            if not expanded:
+                # Greedy decoding returns one sequence per row, so expand rows up front
+                inputs = {
+                    key: value.repeat_interleave(num_return_sequences, dim=0)
+                    for key, value in inputs.items()
+                }
+                expanded = True
+            sampling_kwargs = {
+                'logits_processor': seeded_sampling_processors(
+                    seed, self.temperature, self.top_k, self.top_p
+                ),
+                'do_sample': False
+            }
+        
+        with torch.no_grad():
+            output = self.model.generate(
+                **inputs,
+                **length_kwargs,
+                **sampling_kwargs,
+                stopping_criteria=stopping_criteria,
+                streamer=streamer,
+                num_return_sequences=1 if expanded else num_return_sequences,     
+                no_repeat_ngram_size=2,
+                pad_token_id=self.tokenizer.pad_token_id
+            )
+        
+        if usage is not None:
+            # Every returned row processed its prompt; finished rows are padded
+            prompt_tokens = int(inputs['attention_mask'].sum())
+            usage['prompt_tokens'] = prompt_tokens if expanded else prompt_tokens * num_return_sequences
+            generated = output[:, inputs['input_ids'].shape[1]:]
+            usage['completion_tokens'] = int((generated != self.tokenizer.pad_token_id).sum())
+        
+        return output
+
+    def _encode_prompts(self, prompts, num_return_sequences):
+        """
+        Encode a batch of prompts, starting from cached prefix key/values when possible
+        
+        Returns:
+            Tuple[dict, bool]: generate() inputs, and whether rows are already
+            expanded to num_return_sequences per prompt
+        """
+        prefix = self.prefix_cache.match(prompts[0]) if self.prefix_cache else None
+        cached = None
+        if prefix and all(prompt.startswith(prefix) for prompt in prompts):
+            cached = self.prefix_cache.get(prefix)
+        
+        if cached is None:
+            # Left-padded so every sequence continues from its own end
+            inputs = self.tokenizer(prompts, return_tensors='pt', padding=True).to(self.device)
+            return dict(inputs), False
+        
+        prefix_ids, layers = cached
+        suffixes = self.tokenizer(
+            [prompt[len(prefix):] for prompt in prompts],
+            return_tensors='pt',
+            padding=True
+        ).to(self.device)
+        
+        # Padding sits between the shared prefix and each topic; the attention
+        # mask keeps positions contiguous for every row
+        batch_prefix = prefix_ids.expand(len(prompts), -1)
+        input_ids = torch.cat([batch_prefix, suffixes.input_ids], dim=1)
+        attention_mask = torch.cat([torch.ones_like(batch_prefix), suffixes.attention_mask], dim=1)
+        
+        # Expand rows up front so the cache and inputs share one batch size
+        input_ids = input_ids.repeat_interleave(num_return_sequences, dim=0)
+        attention_mask = attention_mask.repeat_interleave(num_return_sequences, dim=0)
+        past_key_values = self.prefix_cache.build_cache(layers, input_ids.shape[0])
+        
+        return {
+            'input_ids': input_ids,
+            'attention_mask': attention_mask,
+            'past_key_values': past_key_values
+        }, True
+
+    def generate_thread(self, topic=None, length=3, max_tweet_length=280, candidates_per_tweet=1, seed=None):
         """
         Generate a thread of AI-powered tweets
+        
+        All thread segments are sampled in a single batched model call. With one
+        candidate per tweet a whole thread costs the same number of sequences as
+        a single tweet.
+        
+        Args:
+            topic (str): Optional thread topic
+            length (int): Number of tweets in the thread
+            max_tweet_length (int): Maximum length per tweet
+            candidates_per_tweet (int): Candidates sampled for each segment
+            seed (int): Optional seed for a reproducible thread
+        
+        Returns:
+            List[str]: Thread tweets in order
         """
-        thread = []
-        for _ in range(length):
-            # Use topic as initial prompt if provided
-            prompt = f"Continuing the discussion about {topic}:" if topic else None
-            tweet = self.generate_tweet(prompt, max_tweet_length)
-            thread.append(tweet)
-        
-        return thread
+        # Use topic as initial prompt if provided
+        prompt = f"{self.thread_prompt_prefix} {topic}:" if topic else None
+        
+        return self.generate_batch(
+            [prompt] * length,
+            max_tweet_length,
+            num_return_sequences=candidates_per_tweet,
+            seed=seed
+        )
 
 # Demonstration
 if __name__ == "__main__":
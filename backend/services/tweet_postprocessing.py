@@ -0,0 +1,91 @@
+import random
+import re
+from typing import List, Optional, Sequence
+from .twitter_text import char_weight, weighted_length, SCALE
+
+DEFAULT_HASHTAGS = ['#Innovation', '#Technology', '#AI', '#Future']
+
+# Candidates are joined with a non-character so one substitution covers the
+# whole batch; none of the patterns below can match across it
+SEPARATOR = '\n\uffff\n'
+URL_PATTERN = re.compile(r'http[^\s\uffff]+')
+SPECIAL_TOKEN_PATTERN = re.compile(r'<[^>\uffff]*>')
+HASHTAG_PATTERN = re.compile(r'#\w+')
+
+def truncate_weighted(text: str, max_length: int = 280) -> str:
+    """
+    Truncate text to a weighted tweet length, cutting at a word boundary
+
+    :param text: Text to truncate
+    :param max_length: Maximum weighted length
+    :return: Truncated text
+    """
+    if text.isascii():
+        # Every ASCII character weighs exactly one
+        if len(text) <= max_length:
+            return text
+        end = max_length
+    else:
+        budget = max_length * SCALE
+        end = len(text)
+        for index, char in enumerate(text):
+            budget -= char_weight(char)
+            if budget < 0:
+                end = index
+                break
+        else:
+            return text
+
+    # Prefer not to cut a word in half
+    boundary = text.rfind(' ', 0, end + 1)
+    if boundary > 0:
+        end = boundary
+    return text[:end].rstrip()
+
+def clean_tweets(texts: Sequence[str], max_length: int = 280,
+                 hashtags: Optional[Sequence[str]] = DEFAULT_HASHTAGS,
+                 rng=random) -> List[str]:
+    """
+    Clean a batch of generated candidates into tweets
+
+    Strips URLs and special tokens, collapses whitespace, truncates to the
+    weighted tweet length at a word boundary and adds a hashtag when none
+    is present, shortening the text further so the tag still fits.
+
+    :param texts: Raw generated texts
+    :param max_length: Maximum weighted length, including an added hashtag
+    :param hashtags: Hashtags to choose from, or None to skip enforcement
+    :param rng: Random source used to pick hashtags
+    :return: Cleaned tweets, in input order
+    """
+    if not texts:
+        return []
+
+    joined = SEPARATOR.join(texts)
+    joined = SPECIAL_TOKEN_PATTERN.sub('', URL_PATTERN.sub('', joined))
+    parts = joined.split(SEPARATOR)
+    if len(parts) != len(texts):
+        # A candidate contained the separator itself; clean one at a time
+        parts = [
+            SPECIAL_TOKEN_PATTERN.sub('', URL_PATTERN.sub('', text)) for text in texts
+        ]
+
+    search_hashtag = HASHTAG_PATTERN.search
+    tweets = []
+    for text in parts:
+        text = ' '.join(text.split())
+        truncated = truncate_weighted(text, max_length)
+        if hashtags and not search_hashtag(truncated):
+            tag = f" {rng.choice(hashtags)}"
+            truncated = truncate_weighted(text, max_length - weighted_length(tag)) + tag
+        tweets.append(truncated.strip())
+
+    return tweets
+
+def clean_tweet(text: str, max_length: int = 280,
+                hashtags: Optional[Sequence[str]] = DEFAULT_HASHTAGS,
+                rng=random) -> str:
+    """
+    Clean a single generated text into a tweet
+    """
+    return clean_tweets([text], max_length, hashtags, rng)[0]
@@ -0,0 +1,50 @@
+import re
+import unicodedata
+
+# Twitter's weighted length configuration (twitter-text v3)
+MAX_WEIGHTED_LENGTH = 280
+DEFAULT_WEIGHT = 200
+SCALE = 100
+TRANSFORMED_URL_LENGTH = 23
+
+# Code point ranges that count as a single character
+LIGHT_RANGES = (
+    (0, 4351),
+    (8192, 8205),
+    (8208, 8223),
+    (8242, 8247)
+)
+
+URL_PATTERN = re.compile(r'https?://\S+|www\.\S+')
+
+def char_weight(char: str) -> int:
+    """
+    Weight of a single character in hundredths of a tweet character
+
+    :param char: Single character
+    :return: 100 for light characters, 200 otherwise
+    """
+    code_point = ord(char)
+    for start, end in LIGHT_RANGES:
+        if start <= code_point <= end:
+            return SCALE
+    return DEFAULT_WEIGHT
+
+def weighted_length(text: str) -> int:
+    """
+    Length of text as Twitter counts it
+
+    Characters outside the light ranges (CJK, emoji, ...) count twice and
+    every URL counts as 23 characters regardless of its length.
+
+    :param text: Tweet text
+    :return: Weighted character count
+    """
+    text = unicodedata.normalize('NFC', text)
+
+    url_count = 0
+    if 'http' in text or 'www.' in text:
+        text, url_count = URL_PATTERN.subn('', text)
+
+    weight = sum(char_weight(char) for char in text)
+    return weight // SCALE + url_count * TRANSFORMED_URL_LENGTH
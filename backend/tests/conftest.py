@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Tests import the backend packages the way the server does (from services...)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,57 @@
+import asyncio
+import pytest
+from services.ai_content_generator import AIContentGenerator
+
+def make_generator(monkeypatch, openai_delay: float, fallback_delay: float):
+    monkeypatch.delenv('OPENAI_API_KEY', raising=False)
+    generator = AIContentGenerator()
+    # Pretend OpenAI is configured; both providers are replaced below
+    generator.async_client = object()
+    generator.hedge_after = 0.01
+
+    async def failing_openai(operation, request, parse, ticket):
+        await asyncio.sleep(openai_delay)
+        raise RuntimeError("openai down")
+
+    async def failing_fallback(operation, fallback):
+        await asyncio.sleep(fallback_delay)
+        raise RuntimeError("fallback down")
+
+    monkeypatch.setattr(generator, '_aopenai', failing_openai)
+    monkeypatch.setattr(generator, '_afallback', failing_fallback)
+    return generator
+
+def test_hedge_fails_then_openai_fails_raises(monkeypatch):
+    # The hedge starts after 10ms and fails at ~30ms; OpenAI fails at ~80ms
+    generator = make_generator(monkeypatch, openai_delay=0.08, fallback_delay=0.02)
+
+    with pytest.raises(RuntimeError, match="openai down"):
+        asyncio.run(generator.agenerate_tweet('AI'))
+
+def test_openai_fails_then_fallback_fails_raises(monkeypatch):
+    generator = make_generator(monkeypatch, openai_delay=0.0, fallback_delay=0.0)
+    generator.hedge_after = 0
+
+    with pytest.raises(RuntimeError, match="fallback down"):
+        asyncio.run(generator.agenerate_tweet('AI'))
+
+def test_trial_cancelled_while_waiting_for_a_slot_is_released(monkeypatch):
+    monkeypatch.delenv('OPENAI_API_KEY', raising=False)
+    generator = AIContentGenerator()
+    generator.async_client = object()
+    generator.max_concurrency = 1
+    health = generator.openai_health
+    # Half-open: the cool-down has passed, so the next call is the trial
+    health._opened_at = -health.cooldown_seconds
+
+    async def scenario():
+        async with generator._concurrency_limit():
+            ticket = health.allow()
+            trial = asyncio.ensure_future(generator._aopenai('tweet', {'model': 'gpt'}, str, ticket))
+            await asyncio.sleep(0.01)
+            trial.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await trial
+
+    asyncio.run(scenario())
+    assert health.allow() is not None
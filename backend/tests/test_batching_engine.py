@@ -0,0 +1,82 @@
+import threading
+import pytest
+from services.batching_engine import BatchingInferenceEngine
+
+class RecordingGenerator:
+    def __init__(self, block: bool = False):
+        self.batches = []
+        self.started = threading.Event()
+        self.release = threading.Event()
+        if not block:
+            self.release.set()
+
+    def generate_batch(self, prompts, max_length):
+        self.batches.append((list(prompts), max_length))
+        self.started.set()
+        self.release.wait(5)
+        return [f"{prompt}:{max_length}" for prompt in prompts]
+
+@pytest.fixture
+def make_engine():
+    engines = []
+
+    def make(generator, **kwargs):
+        engine = BatchingInferenceEngine(generator, **{'batch_window_ms': 50, **kwargs})
+        engines.append((engine, generator))
+        return engine
+
+    yield make
+    for engine, generator in engines:
+        generator.release.set()
+        engine.shutdown()
+
+def test_results_are_routed_to_their_callers(make_engine):
+    generator = RecordingGenerator()
+    engine = make_engine(generator)
+
+    futures = {prompt: engine.submit(prompt, 280) for prompt in ('a', 'b', 'c')}
+    short = engine.submit('d', 100)
+
+    assert {prompt: future.result(5) for prompt, future in futures.items()} == {
+        'a': 'a:280', 'b': 'b:280', 'c': 'c:280'
+    }
+    assert short.result(5) == 'd:100'
+    # Different length budgets cannot share a model call
+    assert sorted(max_length for _, max_length in generator.batches) == [100, 280]
+
+def test_cancel_while_queued_drops_only_that_prompt(make_engine):
+    generator = RecordingGenerator()
+    engine = make_engine(generator)
+    done = []
+
+    futures = [engine.submit(prompt, on_done=lambda prompt=prompt: done.append(prompt)) for prompt in 'abc']
+    assert futures[1].cancel()
+
+    assert futures[0].result(5) == 'a:280'
+    assert futures[2].result(5) == 'c:280'
+    assert generator.batches == [(['a', 'c'], 280)]
+    assert sorted(done) == ['a', 'b', 'c']
+
+def test_cancel_while_generating_does_not_fail_the_batch(make_engine):
+    generator = RecordingGenerator(block=True)
+    engine = make_engine(generator)
+
+    futures = [engine.submit(prompt) for prompt in 'abc']
+    assert generator.started.wait(5)
+
+    # Running prompts can no longer be cancelled
+    assert not futures[0].cancel()
+    generator.release.set()
+
+    assert [future.result(5) for future in futures] == ['a:280', 'b:280', 'c:280']
+
+def test_failed_model_call_fails_its_batch(make_engine):
+    class FailingGenerator(RecordingGenerator):
+        def generate_batch(self, prompts, max_length):
+            raise RuntimeError("out of memory")
+
+    engine = make_engine(FailingGenerator())
+    future = engine.submit('a')
+
+    with pytest.raises(RuntimeError, match="out of memory"):
+        future.result(5)
@@ -0,0 +1,60 @@
+import asyncio
+import threading
+import pytest
+from routes import content_routes
+from services.batching_engine import BatchingInferenceEngine
+from services.inference_executor import InferenceExecutor
+
+class SlowGenerator:
+    def __init__(self):
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def generate_batch(self, prompts, max_length):
+        self.started.set()
+        self.release.wait(5)
+        return [f"tweet for {prompt}" for prompt in prompts]
+
+def test_cancelled_bulk_item_leaves_batched_items_intact(monkeypatch):
+    generator = SlowGenerator()
+    engine = BatchingInferenceEngine(generator, batch_window_ms=50, max_batch_size=8)
+    executor = InferenceExecutor(max_workers=1, max_queue_size=4)
+
+    async def aget_engine():
+        return engine
+
+    async def aget_generator():
+        return generator
+
+    monkeypatch.setattr(content_routes.model_registry, 'aget_engine', aget_engine)
+    monkeypatch.setattr(content_routes.model_registry, 'aget_generator', aget_generator)
+    monkeypatch.setattr(content_routes, 'inference_executor', executor)
+
+    async def scenario():
+        specs = [
+            content_routes.BulkGenerationSpec(topic=topic, generator='transformer')
+            for topic in ('AI', 'Cloud')
+        ]
+        tasks = [asyncio.ensure_future(content_routes._generate_bulk_item(spec)) for spec in specs]
+        await asyncio.to_thread(generator.started.wait, 5)
+
+        # What generate_bulk does for a client that went away mid-batch
+        tasks[0].cancel()
+        await asyncio.sleep(0.05)
+        # The engine is still computing the cancelled prompt, so its slot is held
+        assert executor.stats()['pending'] == 2
+
+        generator.release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await tasks[0]
+        return await tasks[1]
+
+    try:
+        result = asyncio.run(scenario())
+    finally:
+        generator.release.set()
+        engine.shutdown()
+
+    assert len(result) == 1 and result[0].startswith("tweet for") and "Cloud" in result[0]
+    assert engine.stats()['largest_batch'] == 2
+    assert executor.stats()['pending'] == 0
@@ -0,0 +1,72 @@
+import asyncio
+import threading
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from routes import tweet_generator_routes
+from services.inference_executor import InferenceExecutor, InferenceQueueFull
+
+@pytest.fixture
+def blocked_executor():
+    release = threading.Event()
+    executor = InferenceExecutor(max_workers=1, max_queue_size=1)
+    yield executor, release
+    release.set()
+    executor.shutdown()
+
+def test_full_queue_rejects_until_a_slot_frees(blocked_executor):
+    executor, release = blocked_executor
+    running = executor.submit(release.wait, 5)
+    queued = executor.submit(release.wait, 5)
+
+    with pytest.raises(InferenceQueueFull):
+        executor.submit(release.wait, 5)
+    assert executor.stats()['rejected'] == 1
+
+    release.set()
+    running.result(5)
+    queued.result(5)
+    assert executor.stats()['pending'] == 0
+    assert executor.submit(lambda: 'ok').result(5) == 'ok'
+
+def test_cancelled_run_holds_its_slot_until_the_job_finishes(blocked_executor):
+    executor, release = blocked_executor
+
+    async def scenario():
+        task = asyncio.ensure_future(executor.run(release.wait, 5))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        await asyncio.sleep(0.05)
+        pending_after_cancel = executor.stats()['pending']
+        release.set()
+        await asyncio.to_thread(executor.shutdown)
+        return pending_after_cancel
+
+    assert asyncio.run(scenario()) == 1
+    assert executor.stats()['pending'] == 0
+
+def test_full_queue_returns_503(blocked_executor, monkeypatch):
+    executor, release = blocked_executor
+    executor.submit(release.wait, 5)
+    executor.submit(release.wait, 5)
+
+    class Generator:
+        model = None
+
+        def generate_thread(self, **kwargs):
+            return ['never reached']
+
+    async def aget_generator():
+        return Generator()
+
+    monkeypatch.setattr(tweet_generator_routes, 'inference_executor', executor)
+    monkeypatch.setattr(tweet_generator_routes.model_registry, 'aget_generator', aget_generator)
+    app = FastAPI()
+    app.include_router(tweet_generator_routes.router)
+
+    response = TestClient(app).post(
+        '/generate-tweet', json={'topic': 'AI', 'tone': 'professional', 'type': 'thread'}
+    )
+
+    assert response.status_code == 503
+    assert response.headers['retry-after'] == '1'
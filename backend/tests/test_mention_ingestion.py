@@ -0,0 +1,134 @@
+import asyncio
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from services import mention_ingestion
+from services.auto_reply import AutoReplyPipeline
+from services.mention_ingestion import MentionIngestor
+
+def mention(mention_id: int, author: str = 'fan') -> SimpleNamespace:
+    return SimpleNamespace(
+        id=mention_id, full_text=f"Great work! #{mention_id}",
+        created_at=datetime.now(timezone.utc), user=SimpleNamespace(screen_name=author)
+    )
+
+class FakeApi:
+    def __init__(self):
+        self.mentions = []
+        self.calls = 0
+
+    def mentions_timeline(self, since_id=None, max_id=None, count=200, tweet_mode=None):
+        self.calls += 1
+        newest_first = sorted(self.mentions, key=lambda status: -status.id)
+        return [
+            status for status in newest_first
+            if (since_id is None or status.id > since_id) and (max_id is None or status.id <= max_id)
+        ][:count]
+
+class FakeAccounts:
+    def __init__(self, api):
+        self.api = api
+
+    def get_account(self, username):
+        return self.api
+
+    def get_accounts(self):
+        return ['Brand']
+
+class FakeSentiment:
+    def batch_sentiment_analysis(self, texts, mode='both'):
+        return [{'vader_compound': 0.6} for _ in texts]
+
+    def generate_reply_based_on_sentiment(self, text, label):
+        return f"Thanks! ({label})"
+
+class FakeTweetHandler:
+    def __init__(self, account_manager):
+        self.account_manager = account_manager
+        self.replied = []
+
+    def reply_to_tweet(self, username, tweet_id, text):
+        self.replied.append(tweet_id)
+        return True
+
+def test_mentions_refused_by_a_full_pipeline_are_retried():
+    api = FakeApi()
+    accounts = FakeAccounts(api)
+    handler = FakeTweetHandler(accounts)
+    pipeline = AutoReplyPipeline(
+        handler, FakeSentiment(), batch_wait=0.01, max_in_flight=1, burst=100
+    )
+    ingestor = MentionIngestor(accounts, FakeSentiment(), on_mentions=pipeline.submit_mentions)
+
+    async def settle():
+        for _ in range(100):
+            if pipeline.stats()['in_flight'] == 0:
+                return
+            await asyncio.sleep(0.01)
+
+    async def scenario():
+        await pipeline.start()
+        api.mentions = [mention(1)]
+        # The first poll only sets the cursor
+        await asyncio.to_thread(ingestor.poll_all)
+
+        api.mentions += [mention(2), mention(3), mention(4), mention(5, author='brand')]
+        await asyncio.to_thread(ingestor.poll_all)
+        await settle()
+        assert len(handler.replied) == 1
+
+        # Nothing new arrives; the refused mentions are offered again
+        for _ in range(3):
+            await asyncio.to_thread(ingestor.poll_all)
+            await settle()
+        await pipeline.shutdown()
+
+    asyncio.run(scenario())
+
+    # Mention 1 predates the cursor and 5 was written by a managed account
+    assert sorted(handler.replied) == [2, 3, 4]
+    assert pipeline.stats()['rejected'] >= 2
+    # Sentiment counts each mention once, however often it was offered
+    assert ingestor.dashboard()['Brand']['mentions_ingested'] == 5
+
+def test_backlog_beyond_max_pages_resumes_where_paging_stopped(monkeypatch):
+    monkeypatch.setattr(mention_ingestion, 'PAGE_SIZE', 2)
+    api = FakeApi()
+    received = []
+    ingestor = MentionIngestor(
+        FakeAccounts(api), FakeSentiment(), max_pages=2,
+        on_mentions=lambda username, mentions: received.extend(status.id for status in mentions)
+    )
+
+    api.mentions = [mention(1)]
+    ingestor.poll_all()
+    api.mentions += [mention(mention_id) for mention_id in range(2, 9)]
+    for _ in range(3):
+        ingestor.poll_all()
+
+    assert sorted(received) == list(range(2, 9))
+    assert ingestor.dashboard()['Brand']['since_id'] == 8
+
+def test_short_page_ends_paging():
+    api = FakeApi()
+    ingestor = MentionIngestor(FakeAccounts(api), FakeSentiment())
+    api.mentions = [mention(1)]
+    ingestor.poll_all()
+
+    api.mentions.append(mention(2))
+    api.calls = 0
+    assert ingestor.poll_all() == 1
+    assert api.calls == 1
+
+def test_failing_callback_does_not_stop_polling():
+    api = FakeApi()
+
+    def failing(username, mentions):
+        raise RuntimeError("callback broke")
+
+    ingestor = MentionIngestor(FakeAccounts(api), FakeSentiment(), on_mentions=failing)
+    api.mentions = [mention(1)]
+    ingestor.poll_all()
+    api.mentions.append(mention(2))
+
+    assert ingestor.poll_all() == 0
+    assert ingestor.dashboard()['Brand']['mentions_ingested'] == 2
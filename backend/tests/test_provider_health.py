@@ -0,0 +1,33 @@
+from services.provider_health import ProviderHealth
+
+def half_open() -> ProviderHealth:
+    health = ProviderHealth('openai', failure_threshold=1, cooldown_seconds=30)
+    health.record_failure(0.1)
+    # Pretend the cool-down has passed
+    health._opened_at -= health.cooldown_seconds
+    return health
+
+def test_only_the_trial_ticket_gives_back_the_trial():
+    health = half_open()
+    trial = health.allow()
+    assert trial is not None
+    assert health.allow() is None
+
+    health.release(trial + 1)
+    assert health.allow() is None
+
+    health.release(trial)
+    assert health.allow() is not None
+
+def test_failed_trial_reopens_the_circuit():
+    health = half_open()
+    trial = health.allow()
+    health.record_failure(0.1, trial)
+    assert health.state == 'open'
+    assert health.allow() is None
+
+def test_closed_circuit_tickets_are_not_trials():
+    health = ProviderHealth('openai', failure_threshold=5)
+    ticket = health.allow()
+    health.record_failure(0.1, ticket)
+    assert health.state == 'closed'
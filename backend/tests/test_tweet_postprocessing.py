@@ -0,0 +1,22 @@
+import random
+from services.tweet_postprocessing import clean_tweet, clean_tweets
+from services.twitter_text import weighted_length
+
+def test_added_hashtag_fits_within_max_length():
+    text = ' '.join(['generation'] * 60)
+    tweet = clean_tweet(text, 280, hashtags=['#Innovation'])
+
+    assert tweet.endswith(' #Innovation')
+    assert weighted_length(tweet) <= 280
+
+def test_added_hashtag_fits_for_weighted_characters():
+    # CJK characters weigh two, so 200 of them are 400 weighted
+    tweets = clean_tweets(['技术' * 100, 'short tweet'], 280, rng=random.Random(1))
+
+    assert all(weighted_length(tweet) <= 280 for tweet in tweets)
+    assert tweets[1].startswith('short tweet #')
+
+def test_existing_hashtag_is_kept_without_adding_one():
+    tweet = clean_tweet('Shipping today #Launch', 280, hashtags=['#Innovation'])
+
+    assert tweet == 'Shipping today #Launch'
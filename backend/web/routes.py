@@ -1,16 +1,48 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException, Depends
 from pydantic import BaseModel
+from typing import Optional
 from backend.services.auth_service import AuthService
 from backend.core.account_manager import AccountManager
 from backend.core.tweet_handler import TweetHandler
+from backend.services.near_duplicate import near_duplicate_index
+from backend.services.mention_ingestion import MentionIngestor
+from backend.services.auto_reply import AutoReplyPipeline
+import os
 import tweepy
 
-app = FastAPI(title="X-Twitter Bot Dashboard")
-
 # Initialize services
 auth_service = AuthService()
 account_manager = AccountManager()
-tweet_handler = TweetHandler(account_manager)
+# NEAR_DUPLICATE_GUARD=false allows reposting similar content
+tweet_handler = TweetHandler(
+    account_manager,
+    duplicate_index=near_duplicate_index if os.getenv('NEAR_DUPLICATE_GUARD', 'true').lower() == 'true' else None
+)
+# AUTO_REPLY_ENABLED=true replies to every ingested mention
+auto_reply_enabled = os.getenv('AUTO_REPLY_ENABLED', 'false').lower() == 'true'
+auto_reply_pipeline = AutoReplyPipeline(tweet_handler)
+mention_ingestor = MentionIngestor(
+    account_manager,
+    sentiment_service=auto_reply_pipeline.sentiment_service,
+    on_mentions=auto_reply_pipeline.submit_mentions if auto_reply_enabled else None
+)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if auto_reply_enabled:
+        await auto_reply_pipeline.start()
+    
+    # Poll managed accounts' mentions into rolling sentiment windows
+    if os.getenv('MENTION_INGESTION_ENABLED', 'true').lower() == 'true':
+        mention_ingestor.start()
+    
+    yield
+    
+    mention_ingestor.shutdown()
+    await auto_reply_pipeline.shutdown()
+
+app = FastAPI(title="X-Twitter Bot Dashboard", lifespan=lifespan)
 
 class TwitterCredentials(BaseModel):
     username: str
@@ -86,3 +118,19 @@ async def post_tweet(username: str, content: str):
         return {"status": "success", "tweet_id": result.id}
     else:
         raise HTTPException(status_code=400, detail="Failed to post tweet")
+
+@app.get("/mentions/sentiment")
+async def get_mention_sentiment(username: Optional[str] = None):
+    """
+    Rolling 1h/24h/7d mention sentiment per managed account
+    """
+    if username and username not in account_manager.get_accounts():
+        raise HTTPException(status_code=404, detail=f"Account {username} not found")
+    return {"accounts": mention_ingestor.dashboard(username)}
+
+@app.get("/auto-reply/stats")
+async def get_auto_reply_stats():
+    """
+    Report auto-reply stage counters, queue depths and posting throughput
+    """
+    return auto_reply_pipeline.stats()